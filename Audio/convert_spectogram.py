@@ -1,18 +1,14 @@
 import os
+import sys
 import librosa
 import numpy as np
 
-input_root = "D:/Licenta/Datasets/Audio/data/Split_Wav"
-output_root = "D:/Licenta/Datasets/Audio/data/MelSpectrograms"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "models-integration-backend"))
 
-n_mels = 128
-target_shape = (128, 128)
+from utils.audio_dsp import mel_features
 
-def pad_or_crop(mel, target_shape):
-    mel = mel[:, :target_shape[1]] if mel.shape[1] >= target_shape[1] else np.pad(
-        mel, ((0, 0), (0, target_shape[1] - mel.shape[1])), mode='constant'
-    )
-    return mel
+input_root = "D:/Licenta/Datasets/Audio/data/Split_Wav"
+output_root = "D:/Licenta/Datasets/Audio/data/MelSpectrograms"
 
 for split in ['train', 'test']:
     input_dir = os.path.join(input_root, split)
@@ -40,12 +36,6 @@ for split in ['train', 'test']:
             file_path = os.path.join(cls_path, file)
             y, sr = librosa.load(file_path, sr=16000)
 
-            mel = librosa.feature.melspectrogram(y=y, sr=sr, n_mels=n_mels)
-            mel_db = librosa.power_to_db(mel, ref=np.max)
-
-            mel_db = (mel_db - np.mean(mel_db)) / np.std(mel_db)
-            mel_db = pad_or_crop(mel_db, target_shape)
-
-            np.save(spec_path, mel_db)
+            np.save(spec_path, mel_features(y, sr))
 
 print("Toate fișierele din Split_Wav/train și test au fost convertite în .npy dacă lipseau.")
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import librosa
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "models-integration-backend"))
+
+from utils.audio_dsp import fit_segment, has_voice, mel_features
+
+input_dir = "D:/Licenta/Datasets/Audio/data/Augmented_Output"
+wav_root = "D:/Licenta/Datasets/Audio/data/Split_Wav"
+mel_root = "D:/Licenta/Datasets/Audio/data/MelSpectrograms"
+manifest_path = "D:/Licenta/Datasets/Audio/data/pipeline_manifest.jsonl"
+
+target_sr = 16000
+segment_len = 160000
+train_ratio = 0.8
+augmentation_suffixes = ("noise", "shifted", "pitch_up", "pitch_down", "vol_up", "vol_down")
+workers = max(1, (os.cpu_count() or 2) - 1)
+
+
+def recording_stem(file):
+    base = os.path.splitext(file)[0]
+    for suffix in augmentation_suffixes:
+        if base.endswith("_" + suffix):
+            return base[:-len(suffix) - 1]
+    return base
+
+
+def split_for(cls, file):
+    digest = hashlib.sha1(f"{cls}/{recording_stem(file)}".encode("utf-8")).digest()
+    return "train" if int.from_bytes(digest[:8], "big") / 2 ** 64 < train_ratio else "test"
+
+
+def process_file(cls, file):
+    source = f"{cls}/{file}"
+    split = split_for(cls, file)
+    y, sr = librosa.load(os.path.join(input_dir, cls, file), sr=target_sr)
+    y = y / np.max(np.abs(y))
+
+    wav_dir = os.path.join(wav_root, split, cls)
+    mel_dir = os.path.join(mel_root, split, cls)
+    os.makedirs(wav_dir, exist_ok=True)
+    os.makedirs(mel_dir, exist_ok=True)
+
+    base = os.path.splitext(file)[0]
+    segments, skipped = [], []
+    num_segments = (len(y) + segment_len - 1) // segment_len
+    for i in range(num_segments):
+        segment = fit_segment(y[i * segment_len:(i + 1) * segment_len], segment_len)
+
+        if not has_voice(segment, sr):
+            skipped.append(i + 1)
+            continue
+
+        name = f"{base}_part{i + 1}"
+        sf.write(os.path.join(wav_dir, name + ".wav"), segment, target_sr)
+        np.save(os.path.join(mel_dir, name + ".npy"), mel_features(segment, sr))
+        segments.append(name)
+
+    return {"source": source, "class": cls, "split": split, "segments": segments, "skipped": skipped}
+
+
+def load_manifest(path):
+    done = set()
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)["source"])
+                except (ValueError, KeyError):
+                    continue
+    return done
+
+
+def pending_files(done):
+    for cls in sorted(os.listdir(input_dir)):
+        cls_path = os.path.join(input_dir, cls)
+        if not os.path.isdir(cls_path):
+            continue
+        for file in sorted(os.listdir(cls_path)):
+            if file.endswith(".wav") and f"{cls}/{file}" not in done:
+                yield cls, file
+
+
+if __name__ == "__main__":
+    done = load_manifest(manifest_path)
+    jobs = list(pending_files(done))
+    print(f"{len(done)} fișiere deja procesate, {len(jobs)} rămase ({workers} procese)")
+
+    processed, failed = 0, 0
+    with ProcessPoolExecutor(max_workers=workers) as executor, open(manifest_path, "a", encoding="utf-8") as manifest:
+        futures = {executor.submit(process_file, cls, file): f"{cls}/{file}" for cls, file in jobs}
+        for future in as_completed(futures):
+            try:
+                entry = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"Eroare la {futures[future]}: {e}")
+                continue
+            manifest.write(json.dumps(entry) + "\n")
+            manifest.flush()
+            processed += 1
+
+    print(f"Pipeline finalizat: {processed} fișiere procesate, {failed} erori.")
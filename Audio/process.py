@@ -1,8 +1,13 @@
 import os
+import sys
 import librosa
 import soundfile as sf
 import numpy as np
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "models-integration-backend"))
+
+from utils.audio_dsp import fit_segment, has_voice
+
 input_dir = "D:/Licenta/Datasets/Audio/data/Augmented_Output"
 output_dir = "D:/Licenta/Datasets/Audio/data/Processed_Wav"
 target_sr = 16000
@@ -10,17 +15,6 @@ segment_len = 160000
 
 os.makedirs(output_dir, exist_ok=True)
 
-def has_voice(y, sr, threshold_energy=0.01, min_voiced_ratio=0.1):
-    frame_length = 2048
-    hop_length = 512
-    energy = np.array([
-        np.sum(np.abs(y[i:i + frame_length] ** 2))
-        for i in range(0, len(y) - frame_length, hop_length)
-    ])
-    voiced_frames = np.sum(energy > threshold_energy)
-    voiced_ratio = voiced_frames / len(energy)
-    return voiced_ratio > min_voiced_ratio
-
 for cls in os.listdir(input_dir):
     cls_path = os.path.join(input_dir, cls)
     if not os.path.isdir(cls_path):
@@ -43,10 +37,7 @@ for cls in os.listdir(input_dir):
         for i in range(num_segments):
             start = i * segment_len
             end = min((i + 1) * segment_len, total_len)
-            segment = y[start:end]
-
-            if len(segment) < segment_len:
-                segment = np.pad(segment, (0, segment_len - len(segment)))
+            segment = fit_segment(y[start:end], segment_len)
 
             if has_voice(segment, sr):
                 base = os.path.splitext(file)[0]
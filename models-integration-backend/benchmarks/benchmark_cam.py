@@ -0,0 +1,44 @@
+import time
+
+import torch
+from pytorch_grad_cam.utils.model_targets import ClassifierOutputTarget
+
+from gradcam.cam_engine import build_cam, get_cam_engine, get_cam_kind, get_target_layers, release_cam_engines
+from models.model_defs import ResNet101_MRI
+
+RUNS = 5
+MODALITIES = ["mri_axial", "mri_sagittal", "drawing"]
+
+
+def run_uncached(model, input_tensor, modality):
+    cam_model, target_layers = get_target_layers(model)
+    cam = build_cam(get_cam_kind(modality), cam_model, target_layers)
+    with torch.inference_mode(not cam.uses_gradients):
+        cam(input_tensor=input_tensor, targets=[ClassifierOutputTarget(0)])
+    cam.activations_and_grads.release()
+
+
+def run_cached(model, input_tensor, modality):
+    get_cam_engine(model, modality)(input_tensor, 0)
+
+
+def measure_s(fn, *args):
+    fn(*args)
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        fn(*args)
+    return (time.perf_counter() - start) / RUNS
+
+
+if __name__ == "__main__":
+    model = ResNet101_MRI(pretrained=False, num_classes=5).eval()
+    input_tensor = torch.randn(1, 3, 256, 256)
+
+    for modality in MODALITIES:
+        uncached = measure_s(run_uncached, model, input_tensor, modality)
+        cached = measure_s(run_cached, model, input_tensor, modality)
+        print(f"{modality} ({get_cam_kind(modality)}): "
+              f"per-request {uncached * 1000:.1f} ms -> {cached * 1000:.1f} ms, "
+              f"overhead saved {(uncached - cached) * 1000:.1f} ms")
+
+    release_cam_engines(model)
@@ -0,0 +1,94 @@
+import glob
+import time
+
+import cv2
+import numpy as np
+from scipy.ndimage import mean as ndi_mean
+from skimage import feature, measure
+
+from contour.tremor_heatmap import drawing_metrics
+
+DRAWINGS_DIR = "D:/Licenta/Datasets/Parkinson_s Drawings/augmented_combined"
+MAX_IMAGES = 20
+REPEATS = 5
+TOLERANCE = 1e-3
+
+
+def reference_metrics(img):
+    img_blur = cv2.medianBlur(img, 3)
+    _, binary = cv2.threshold(img_blur, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    stroke_pixels = img_blur[binary > 0]
+
+    glcm = feature.graycomatrix(binary, distances=[1], angles=[0], levels=256, symmetric=True, normed=True)
+
+    fshift = np.fft.fftshift(np.fft.fft2(img_blur))
+    rows = img.shape[0]
+    magnitude_spectrum = np.log1p(np.abs(fshift))
+    crop_size = rows // 4
+    center = (rows // 2, img.shape[1] // 2)
+    fft_cropped = magnitude_spectrum[
+        center[0] - crop_size:center[0] + crop_size,
+        center[1] - crop_size:center[1] + crop_size
+    ]
+    Yc, Xc = np.indices(fft_cropped.shape)
+    R = np.sqrt((Xc - crop_size)**2 + (Yc - crop_size)**2)
+    r = np.arange(0, crop_size)
+    radial_mean = ndi_mean(fft_cropped, labels=np.round(R).astype(int), index=r)
+
+    return {
+        "stroke_mean": np.mean(stroke_pixels),
+        "stroke_std": np.std(stroke_pixels),
+        "local_contrast": np.std(img_blur),
+        "entropy": measure.shannon_entropy(binary),
+        "glcm_contrast": feature.graycoprops(glcm, 'contrast')[0, 0],
+        "high_freq_power": np.sum(radial_mean[r > 10]) / np.sum(radial_mean)
+    }
+
+
+def synthetic_drawings(count=6, size=512, seed=0):
+    rng = np.random.default_rng(seed)
+    drawings = []
+    for i in range(count):
+        img = np.full((size, size), 255, dtype=np.uint8)
+        t = np.linspace(0, 1, 2000)
+        tremor = rng.normal(0, 1 + i, t.shape).cumsum() * 0.05
+        if i % 2:
+            xs = 40 + t * (size - 80)
+            ys = size / 2 + 80 * np.sin(t * 6 * np.pi) + tremor
+        else:
+            angle = t * 6 * np.pi
+            xs = size / 2 + (t * size * 0.4 + tremor) * np.cos(angle)
+            ys = size / 2 + (t * size * 0.4 + tremor) * np.sin(angle)
+        points = np.round(np.stack([xs, ys], axis=1)).astype(np.int32)
+        cv2.polylines(img, [points], False, 30, 3, cv2.LINE_AA)
+        drawings.append(img)
+    return drawings
+
+
+def timed(fn, img):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        result = fn(img)
+    return result, (time.perf_counter() - start) / REPEATS
+
+
+if __name__ == "__main__":
+    paths = sorted(glob.glob(f"{DRAWINGS_DIR}/**/*.png", recursive=True))[:MAX_IMAGES]
+    images = [cv2.imread(path, cv2.IMREAD_GRAYSCALE) for path in paths] or synthetic_drawings()
+    print(f"{len(images)} drawings ({'from ' + DRAWINGS_DIR if paths else 'synthetic'})")
+
+    reference_times, fast_times, max_errors = [], [], {}
+    for img in images:
+        expected, reference_time = timed(reference_metrics, img)
+        actual, fast_time = timed(lambda image: drawing_metrics(image)["metrics"], img)
+        reference_times.append(reference_time)
+        fast_times.append(fast_time)
+
+        for name, value in expected.items():
+            error = abs(actual[name] - round(float(value), 4))
+            max_errors[name] = max(max_errors.get(name, 0.0), error)
+            assert error <= TOLERANCE, f"{name}: expected {value:.4f}, got {actual[name]}"
+
+    print(f"reference {np.mean(reference_times) * 1000:.1f} ms, fast {np.mean(fast_times) * 1000:.1f} ms, "
+          f"speedup {np.mean(reference_times) / np.mean(fast_times):.1f}x")
+    print("max abs error per metric: " + ", ".join(f"{k}={v:.2e}" for k, v in max_errors.items()))
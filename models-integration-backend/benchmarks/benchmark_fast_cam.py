@@ -0,0 +1,53 @@
+import glob
+import time
+
+import numpy as np
+import torch
+from PIL import Image
+
+from gradcam.cam_engine import get_cam_engine
+from models.model_registry import ModelRegistry
+from transforms.transform_utils import get_transform_for
+
+IMAGES_DIR = "../MRI_Examples/Test"
+MAX_IMAGES = 10
+TARGETS = [
+    ("alzheimer", "mri_axial", "*/*.png"),
+    ("alzheimer", "mri_sagittal", "*/*.png"),
+]
+
+
+def run_cam(engine, input_tensor, pred_class_idx):
+    start = time.perf_counter()
+    cam = engine(input_tensor, pred_class_idx)
+    return cam, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    device = torch.device("cpu")
+    registry = ModelRegistry(device)
+
+    for disease, modality, pattern in TARGETS:
+        model = registry.get(disease, modality, variant="fp32")
+        transform = get_transform_for(disease, modality)
+        paths = sorted(glob.glob(f"{IMAGES_DIR}/{pattern}"))[:MAX_IMAGES]
+        if not paths:
+            print(f"{modality}: no images found under {IMAGES_DIR}/{pattern}")
+            continue
+
+        correlations, times = [], {"full": [], "fast": [], "gradcam": []}
+        for path in paths:
+            input_tensor = transform(Image.open(path).convert("RGB")).unsqueeze(0)
+            with torch.inference_mode():
+                pred_class_idx = model(input_tensor).argmax(dim=1).item()
+
+            cams = {}
+            for mode in times:
+                cams[mode], elapsed = run_cam(get_cam_engine(model, modality, mode), input_tensor, pred_class_idx)
+                times[mode].append(elapsed)
+            correlations.append(np.corrcoef(cams["full"].ravel(), cams["fast"].ravel())[0, 1])
+
+        print(f"{modality} ({len(paths)} images): "
+              f"full {np.mean(times['full']):.2f} s, fast {np.mean(times['fast']):.2f} s, "
+              f"gradcam {np.mean(times['gradcam']):.2f} s, "
+              f"correlation fast vs full {np.mean(correlations):.3f} (min {np.min(correlations):.3f})")
@@ -0,0 +1,66 @@
+import glob
+import time
+
+import librosa
+import numpy as np
+
+from utils.audio_utils import estimate_pitch, pitch_statistics
+
+AUDIO_DIR = "D:/Licenta/Datasets/Audio/data/Split_Wav/test"
+MAX_FILES = 10
+SAMPLE_RATE = 16000
+SEGMENT_LEN = 160000
+N_FRAMES = 128
+
+
+def synthetic_recordings(count=4, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(SEGMENT_LEN) / SAMPLE_RATE
+    recordings = []
+    for i in range(count):
+        f0 = 110 + 40 * i + 15 * np.sin(2 * np.pi * (2 + i) * t) + rng.normal(0, 2 + i, t.shape).cumsum() * 0.001
+        voiced = (t % 2.0) < 1.4
+        y = np.sin(2 * np.pi * np.cumsum(f0) / SAMPLE_RATE) * voiced + 0.05 * rng.normal(size=t.shape)
+        recordings.append((y / np.max(np.abs(y))).astype(np.float32))
+    return recordings
+
+
+def load_recording(path):
+    y, _ = librosa.load(path, sr=SAMPLE_RATE)
+    y = y / np.max(np.abs(y))
+    return np.pad(y, (0, max(0, SEGMENT_LEN - len(y))))[:SEGMENT_LEN]
+
+
+def timed_pitch(y, backend):
+    start = time.perf_counter()
+    pitch = estimate_pitch(y, SAMPLE_RATE, backend)[:N_FRAMES]
+    return pitch, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    paths = sorted(glob.glob(f"{AUDIO_DIR}/**/*.wav", recursive=True))[:MAX_FILES]
+    recordings = [load_recording(path) for path in paths] or synthetic_recordings()
+    print(f"{len(recordings)} recordings ({'from ' + AUDIO_DIR if paths else 'synthetic'})")
+
+    times = {"pyin": [], "yin": []}
+    agreement, cents, sd_errors, jump_errors = [], [], [], []
+    for y in recordings:
+        reference, reference_time = timed_pitch(y, "pyin")
+        fast, fast_time = timed_pitch(y, "yin")
+        times["pyin"].append(reference_time)
+        times["yin"].append(fast_time)
+
+        agreement.append(np.mean((reference > 0) == (fast > 0)))
+        both = (reference > 0) & (fast > 0)
+        if both.any():
+            cents.append(np.median(np.abs(1200 * np.log2(fast[both] / reference[both]))))
+
+        reference_sd, reference_jumps = pitch_statistics(reference)
+        fast_sd, fast_jumps = pitch_statistics(fast)
+        sd_errors.append(abs(fast_sd - reference_sd))
+        jump_errors.append(abs(fast_jumps - reference_jumps))
+
+    print(f"pyin {np.mean(times['pyin']) * 1000:.1f} ms, yin {np.mean(times['yin']) * 1000:.1f} ms, "
+          f"speedup {np.mean(times['pyin']) / np.mean(times['yin']):.0f}x")
+    print(f"voicing agreement {np.mean(agreement):.3f}, median pitch error {np.mean(cents):.2f} cents, "
+          f"pitch_sd error {np.mean(sd_errors):.2f} Hz, pitch_jumps error {np.mean(jump_errors):.1f}")
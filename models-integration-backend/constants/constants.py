@@ -1,2 +1,51 @@
 alz_classes = ["AD", "CN", "EMCI", "LMCI", "MCI"]
 park_classes = ["Control", "PD", "Prodromal", "SWEDD"]
+audio_classes = ["Alzheimer", "Parkinson", "Healthy"]
+
+BATCH_MAX_SIZE = 8
+BATCH_MAX_WAIT_MS = 10
+BATCH_MAX_QUEUE = 64
+
+INFERENCE_WORKERS = 2
+INFERENCE_MAX_PENDING = 32
+
+ENSEMBLE_CASCADE = False
+
+MODEL_WARMUP = None
+MODEL_MEMORY_BUDGET_MB = None
+MODEL_VARIANTS = {}
+USE_EXPORTED_MODELS = False
+
+CAM_WORKERS = 2
+CAM_MAX_QUEUE = 64
+CAM_RESULT_TTL_S = 3600
+CAM_STORE_PATH = None
+CAM_PRIORITY_PREDICT = 0
+CAM_PRIORITY_ENSEMBLE = 5
+CAM_PRIORITY_ENSEMBLE_FUSION = 10
+
+CAM_MODE = "full"
+CAM_BATCH_SIZE = 32
+CAM_CHANNEL_BUDGET = 64
+CAM_FALLBACK_QUEUE_DEPTH = 16
+ENSEMBLE_CAM_FUSION = False
+ENSEMBLE_CAM_WEIGHTS = (0.5, 0.5)
+
+RESULT_CACHE_SIZE = 256
+RESULT_CACHE_TTL_S = 3600
+RESULT_CACHE_PATH = None
+HASH_CHUNK_SIZE = 1 << 20
+
+ARTIFACT_FORMAT = "png"
+ARTIFACT_SOURCE_CACHE_SIZE = 128
+TREMOR_MAP_MAX_SIDE = 256
+
+FEATURE_INDEX_PATH = "cache/features.sqlite"
+FEATURE_INDEX_SIZE = 256
+FEATURE_INDEX_MAX_STORED = 5000
+PITCH_BACKEND = "pyin"
+
+AUDIO_SEGMENT_LEN = 160000
+AUDIO_SEGMENT_BATCH = 16
+AUDIO_MAX_SEGMENTS = 360
+PACKED_FEATURES_ROOT = None
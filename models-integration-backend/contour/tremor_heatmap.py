@@ -1,87 +1,109 @@
 import os
+from functools import lru_cache
+
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.ndimage import mean as ndi_mean
+from scipy import fft as sp_fft
 from skimage import feature, measure
 
-def analyze_drawing_quality(image_path, output_prefix, prediction_id=None):
-    os.makedirs(os.path.dirname(output_prefix), exist_ok=True)
+from constants.constants import ARTIFACT_FORMAT, TREMOR_MAP_MAX_SIDE
+from utils import artifact_renderer
+
+DRAWING_ARTIFACTS = ("fft", "fft_radial", "tremor_camstyle", "contours")
 
-    img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    img_blur = cv2.medianBlur(img, 3)
 
+def _preprocess(img):
+    img_blur = cv2.medianBlur(img, 3)
     _, binary = cv2.threshold(img_blur, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-    mask = binary > 0
-    stroke_pixels = img_blur[mask]
+    return img_blur, binary
 
-    stroke_mean = np.mean(stroke_pixels)
-    stroke_std = np.std(stroke_pixels)
-    local_contrast = np.std(img_blur)
-    entropy = measure.shannon_entropy(binary)
-    glcm = feature.graycomatrix(binary, distances=[1], angles=[0], levels=256, symmetric=True, normed=True)
-    glcm_contrast = feature.graycoprops(glcm, 'contrast')[0, 0]
 
-    f = np.fft.fft2(img_blur)
-    fshift = np.fft.fftshift(f)
-    rows, cols = img.shape
-    crow, ccol = rows // 2, cols // 2
+@lru_cache(maxsize=16)
+def _radial_labels(crop_size):
+    Yc, Xc = np.indices((2 * crop_size, 2 * crop_size))
+    R = np.round(np.sqrt((Xc - crop_size)**2 + (Yc - crop_size)**2)).astype(np.intp).ravel()
+    counts = np.bincount(R)[:crop_size]
+    return R, counts
 
-    r_min = int(0.02 * crow)
-    r_max = int(0.1 * crow)
-    mask_band = np.zeros((rows, cols), np.uint8)
-    Y, X = np.ogrid[:rows, :cols]
-    distance = np.sqrt((Y - crow)**2 + (X - ccol)**2)
-    mask_band[(distance >= r_min) & (distance <= r_max)] = 1
 
-    fshift_band = fshift * mask_band
-    img_tremor = np.abs(np.fft.ifft2(np.fft.ifftshift(fshift_band)))
-    tremor_norm = cv2.normalize(img_tremor, None, 0, 1, cv2.NORM_MINMAX)
+@lru_cache(maxsize=16)
+def _band_mask(shape, r_min, r_max):
+    rows, cols = shape
+    fy = np.fft.fftfreq(rows, 1.0 / rows)[:, None]
+    fx = np.arange(cols // 2 + 1)[None, :]
+    distance = np.sqrt(fy**2 + fx**2)
+    return (distance >= r_min) & (distance <= r_max)
+
 
-    blurred = cv2.GaussianBlur(tremor_norm, (45, 45), 0)
-    blurred_norm = cv2.normalize(blurred, None, 0, 1, cv2.NORM_MINMAX)
-    heatmap = cv2.applyColorMap((blurred_norm * 255).astype(np.uint8), cv2.COLORMAP_JET)
-    img_bgr = cv2.cvtColor(img_blur, cv2.COLOR_GRAY2BGR)
-    overlay = cv2.addWeighted(img_bgr, 0.7, heatmap, 0.3, 0)
+def _magnitude_spectrum(img_blur):
+    rows, cols = img_blur.shape
+    half = np.abs(sp_fft.rfft2(img_blur.astype(np.float64), workers=-1))
+    full = np.empty((rows, cols), dtype=np.float64)
+    full[:, :half.shape[1]] = half
+    mirrored_cols = cols - np.arange(half.shape[1], cols)
+    full[:, half.shape[1]:] = half[(-np.arange(rows)) % rows][:, mirrored_cols]
+    return np.fft.fftshift(full)
 
-    plt.figure(figsize=(6, 6))
-    plt.imshow(cv2.cvtColor(overlay, cv2.COLOR_BGR2RGB))
-    plt.title("Tremor Heatmap")
-    plt.axis('off')
-    plt.savefig(f"{output_prefix}_tremor_camstyle.png", bbox_inches='tight', dpi=200)
-    plt.close()
 
-    magnitude_spectrum = np.log1p(np.abs(fshift))
+def _radial_profile(img_blur):
+    rows, cols = img_blur.shape
+    magnitude_spectrum = np.log1p(_magnitude_spectrum(img_blur))
     crop_size = rows // 4
     center = (rows // 2, cols // 2)
     fft_cropped = magnitude_spectrum[
         center[0] - crop_size:center[0] + crop_size,
         center[1] - crop_size:center[1] + crop_size
     ]
-    Yc, Xc = np.indices(fft_cropped.shape)
-    R = np.sqrt((Xc - crop_size)**2 + (Yc - crop_size)**2)
+    labels, counts = _radial_labels(crop_size)
+    sums = np.bincount(labels, weights=fft_cropped.ravel(), minlength=crop_size)[:crop_size]
     r = np.arange(0, crop_size)
-    radial_mean = ndi_mean(fft_cropped, labels=np.round(R).astype(int), index=r)
-
-    plt.figure(figsize=(6, 6))
-    plt.imshow(fft_cropped, cmap='viridis', extent=[-crop_size, crop_size, -crop_size, crop_size])
-    plt.title("FFT Spectrum")
-    plt.colorbar(label="Log Power")
-    plt.savefig(f"{output_prefix}_fft.png", bbox_inches='tight', dpi=200)
-    plt.close()
-
-    plt.figure(figsize=(6, 4))
-    plt.plot(r, radial_mean)
-    plt.title("Radial Power Profile (FFT)")
-    plt.xlabel("Radius [px]")
-    plt.ylabel("Mean Log Power")
-    plt.grid(True)
-    plt.savefig(f"{output_prefix}_fft_radial.png", bbox_inches='tight', dpi=200)
-    plt.close()
+    return fft_cropped, r, sums / counts
+
+
+def _tremor_map(img_blur):
+    rows, cols = img_blur.shape
+    crow = rows // 2
+    r_min = int(0.02 * crow)
+    r_max = int(0.1 * crow)
+
+    scale = min(1.0, TREMOR_MAP_MAX_SIDE / max(rows, cols))
+    small = img_blur if scale == 1.0 else cv2.resize(
+        img_blur, (max(1, round(cols * scale)), max(1, round(rows * scale))), interpolation=cv2.INTER_AREA
+    )
+
+    spectrum = sp_fft.rfft2(small.astype(np.float32), workers=-1)
+    spectrum *= _band_mask(small.shape, r_min, r_max)
+    img_tremor = np.abs(sp_fft.irfft2(spectrum, s=small.shape, workers=-1))
+    tremor_norm = cv2.normalize(img_tremor, None, 0, 1, cv2.NORM_MINMAX)
+
+    kernel = max(3, int(round(45 * scale)) | 1)
+    blurred = cv2.GaussianBlur(tremor_norm, (kernel, kernel), 0)
+    if scale == 1.0:
+        return blurred
+    return cv2.resize(blurred, (cols, rows), interpolation=cv2.INTER_LINEAR)
+
+
+def _glcm_contrast(binary):
+    glcm = feature.graycomatrix(binary // 255, distances=[1], angles=[0], levels=2, symmetric=True, normed=True)
+    return feature.graycoprops(glcm, 'contrast')[0, 0] * 255 ** 2
+
+
+def drawing_metrics(img, filename=None):
+    img_blur, binary = _preprocess(img)
+    mask = binary > 0
+    stroke_pixels = img_blur[mask]
+
+    stroke_mean = np.mean(stroke_pixels)
+    stroke_std = np.std(stroke_pixels)
+    local_contrast = np.std(img_blur)
+    entropy = measure.shannon_entropy(binary)
+    glcm_contrast = _glcm_contrast(binary)
+
+    _, r, radial_mean = _radial_profile(img_blur)
 
     contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
     all_points = np.vstack([c.squeeze() for c in contours])
-    filename = os.path.basename(image_path).lower()
+    filename = (filename or "").lower()
     if filename.startswith("wave"):
         shape_type = "wave"
     elif filename.startswith("spiral"):
@@ -101,14 +123,48 @@ def analyze_drawing_quality(image_path, output_prefix, prediction_id=None):
         "glcm_contrast": round(float(glcm_contrast), 4),
         "high_freq_power": round(float(high_freq_power), 4)
     }
+    return {"metrics": metrics, "shape_type": shape_type}
+
+
+def render_drawing_artifact(img, kind):
+    img_blur, binary = _preprocess(img)
+
+    if kind == "tremor_camstyle":
+        heatmap = artifact_renderer.colorize(_tremor_map(img_blur), cmap="jet")
+        return artifact_renderer.overlay(img_blur, heatmap, alpha=0.3)
+
+    if kind == "fft":
+        fft_cropped, _, _ = _radial_profile(img_blur)
+        fft_size = max(fft_cropped.shape[0], 512)
+        return artifact_renderer.colorize(fft_cropped, cmap="viridis", size=(fft_size, fft_size))
+
+    if kind == "fft_radial":
+        _, _, radial_mean = _radial_profile(img_blur)
+        return artifact_renderer.line_plot(radial_mean)
+
+    if kind == "contours":
+        contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+        canvas = cv2.cvtColor(img_blur, cv2.COLOR_GRAY2BGR)
+        return cv2.drawContours(canvas, contours, -1, (0, 0, 255), 1)
+
+    raise ValueError(f"Unknown drawing artifact: {kind}")
+
+
+def analyze_drawing_quality(image_path=None, output_prefix=None, prediction_id=None, image=None, filename=None):
+    img = image if image is not None else cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    result = drawing_metrics(img, filename or os.path.basename(image_path or ""))
 
+    if output_prefix:
+        os.makedirs(os.path.dirname(output_prefix), exist_ok=True)
+        for kind in DRAWING_ARTIFACTS:
+            artifact_renderer.write(f"{output_prefix}_{kind}.{ARTIFACT_FORMAT}", render_drawing_artifact(img, kind))
 
     return {
         "prediction_id": prediction_id,
-        "metrics": metrics,
-        "fft_url": f"{output_prefix}_fft.png",
-        "fft_radial_url": f"{output_prefix}_fft_radial.png",
-        "tremor_overlay_url": f"{output_prefix}_tremor_camstyle.png",
-        "shape_type": shape_type,
+        "metrics": result["metrics"],
+        "fft_url": f"{output_prefix}_fft.{ARTIFACT_FORMAT}",
+        "fft_radial_url": f"{output_prefix}_fft_radial.{ARTIFACT_FORMAT}",
+        "tremor_overlay_url": f"{output_prefix}_tremor_camstyle.{ARTIFACT_FORMAT}",
+        "shape_type": result["shape_type"],
         "description": "Pixel-level metrics + soft Grad-CAM-like tremor overlay"
     }
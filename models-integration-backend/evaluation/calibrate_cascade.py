@@ -0,0 +1,73 @@
+import json
+
+import numpy as np
+import torch
+
+from constants.constants import alz_classes, park_classes
+from dataloaders.ensemble_dataloader import axial_loader, sagittal_loader, parkinson_loader
+from evaluation.ensemble_utils import CASCADE_THRESHOLDS_PATH
+from evaluation.eval_ensemble_all import get_ensemble_models
+
+device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+MAX_ACCURACY_DROP = 0.005
+THRESHOLDS = np.round(np.arange(0.50, 1.001, 0.01), 2)
+
+
+def collect_logits(model_r50, model_r101, dataloader):
+    out50, out101, labels = [], [], []
+    with torch.no_grad():
+        for images, targets in dataloader:
+            images = images.to(device)
+            with torch.amp.autocast(device_type=device.type, enabled=(device.type == 'cuda')):
+                out50.append(model_r50(images).float().cpu())
+                out101.append(model_r101(images).float().cpu())
+            labels.append(targets)
+    return torch.cat(out50), torch.cat(out101), torch.cat(labels)
+
+
+def calibrate(model_r50, model_r101, dataloader, w_r50=0.5, w_r101=0.5):
+    out50, out101, labels = collect_logits(model_r50, model_r101, dataloader)
+    probs50 = torch.softmax(out50, dim=1)
+    conf50, preds50 = probs50.max(dim=1)
+    preds_full = (w_r50 * out50 + w_r101 * out101).argmax(dim=1)
+    acc_full = (preds_full == labels).float().mean().item()
+
+    best = None
+    for threshold in THRESHOLDS:
+        escalate = conf50 < threshold
+        preds = torch.where(escalate, preds_full, preds50)
+        acc = (preds == labels).float().mean().item()
+        if acc >= acc_full - MAX_ACCURACY_DROP:
+            best = {
+                "threshold": float(threshold),
+                "accuracy_full": round(acc_full, 4),
+                "accuracy_cascade": round(acc, 4),
+                "r101_fraction": round(escalate.float().mean().item(), 4)
+            }
+            break
+    return best
+
+
+if __name__ == "__main__":
+    members = {
+        "Alzheimer Axial": (*get_ensemble_models("axial"), axial_loader, alz_classes),
+        "Alzheimer Sagittal": (*get_ensemble_models("sagittal"), sagittal_loader, alz_classes),
+        "Parkinson": (*get_ensemble_models("parkinson"), parkinson_loader, park_classes),
+    }
+
+    calibration = {}
+    for name, (model_r50, model_r101, loader, _) in members.items():
+        entry = calibrate(model_r50, model_r101, loader)
+        if entry is None:
+            print(f"{name}: no threshold keeps accuracy within {MAX_ACCURACY_DROP * 100:.1f}%, "
+                  f"skipping (R101 always runs)")
+            continue
+        calibration[name] = entry
+        print(f"{name}: threshold={entry['threshold']:.2f} "
+              f"accuracy {entry['accuracy_full'] * 100:.2f}% -> {entry['accuracy_cascade'] * 100:.2f}%, "
+              f"R101 runs on {entry['r101_fraction'] * 100:.1f}% of inputs")
+
+    with open(CASCADE_THRESHOLDS_PATH, "w") as f:
+        json.dump(calibration, f, indent=2)
+    print(f"Saved cascade thresholds to: {CASCADE_THRESHOLDS_PATH}")
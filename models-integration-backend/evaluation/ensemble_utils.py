@@ -0,0 +1,31 @@
+import json
+import os
+
+import torch
+
+CASCADE_THRESHOLDS_PATH = "models/cascade_thresholds.json"
+
+
+def combine_ensemble_logits(out_r50, out_r101, class_names, w_r50=0.5, w_r101=0.5):
+    combined_logits = w_r50 * out_r50 + w_r101 * out_r101
+    probs = torch.softmax(combined_logits, dim=1)[0]
+    pred_idx = probs.argmax().item()
+    score = probs[pred_idx].item()
+    return pred_idx, class_names[pred_idx], score
+
+
+def cascade_prediction(out_r50, class_names, threshold):
+    probs = torch.softmax(out_r50, dim=1)[0]
+    pred_idx = probs.argmax().item()
+    score = probs[pred_idx].item()
+    if score < threshold:
+        return None
+    return pred_idx, class_names[pred_idx], score
+
+
+def load_cascade_thresholds(path=CASCADE_THRESHOLDS_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        calibration = json.load(f)
+    return {name: entry["threshold"] for name, entry in calibration.items()}
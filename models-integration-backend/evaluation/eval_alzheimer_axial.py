@@ -2,20 +2,9 @@ import torch
 from sklearn.metrics import accuracy_score, classification_report
 
 from constants.constants import alz_classes
-from dataloaders.ensemble_dataloader import axial_loader
-from models.model_defs import ResNetModel, ResNet101_MRI
+from models.model_registry import ModelRegistry
 
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-print(torch.cuda.is_available())
-print(torch.cuda.get_device_name() if torch.cuda.is_available() else "CPU only")
-
-alz_ax_50 = ResNetModel(pretrained=False, num_classes=5)
-alz_ax_50.load_state_dict(torch.load("models/ResNet_Alzheimer_Axial_Multiclass.pth", map_location=device))
-alz_ax_50.to(device).eval()
-
-alz_ax_101 = ResNet101_MRI(pretrained=False, num_classes=5)
-alz_ax_101.load_state_dict(torch.load("models/ResNet101_Alzheimer_Axial_Multiclass.pth", map_location=device))
-alz_ax_101.to(device).eval()
 
 def evaluate_ensemble(model_r50, model_r101, dataloader, class_names, w_r50=0.5, w_r101=0.5,
                       path="ensemble_axial_report.txt"):
@@ -42,5 +31,11 @@ def evaluate_ensemble(model_r50, model_r101, dataloader, class_names, w_r50=0.5,
     return acc
 
 if __name__ == "__main__":
+    from dataloaders.ensemble_dataloader import axial_loader
+
+    print(torch.cuda.get_device_name() if torch.cuda.is_available() else "CPU only")
+    registry = ModelRegistry(device)
+    alz_ax_50 = registry.get("alzheimer", "mri_axial_r50")
+    alz_ax_101 = registry.get("alzheimer", "mri_axial")
     evaluate_ensemble(alz_ax_50, alz_ax_101, axial_loader, alz_classes)
 
@@ -2,21 +2,9 @@ import torch
 from sklearn.metrics import accuracy_score, classification_report
 
 from constants.constants import alz_classes
-from dataloaders.ensemble_dataloader import sagittal_loader
-from models.model_defs import ResNetModel, ResNet101_MRI
+from models.model_registry import ModelRegistry
 
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-print(torch.cuda.is_available())
-print(torch.cuda.get_device_name() if torch.cuda.is_available() else "CPU only")
-
-
-alz_sag_50 = ResNetModel(pretrained=False, num_classes=5)
-alz_sag_50.load_state_dict(torch.load("models/ResNet_Alzheimer_Sagittal_Multiclass.pth", map_location=device))
-alz_sag_50.to(device).eval()
-
-alz_sag_101 = ResNet101_MRI(pretrained=False, num_classes=5)
-alz_sag_101.load_state_dict(torch.load("models/ResNet101_Alzheimer_Sagittal_Multiclass.pth", map_location=device))
-alz_sag_101.to(device).eval()
 
 
 def evaluate_ensemble(model_r50, model_r101, dataloader, class_names, w_r50=0.5, w_r101=0.5,
@@ -45,5 +33,11 @@ def evaluate_ensemble(model_r50, model_r101, dataloader, class_names, w_r50=0.5,
 
 
 if __name__ == "__main__":
+    from dataloaders.ensemble_dataloader import sagittal_loader
+
+    print(torch.cuda.get_device_name() if torch.cuda.is_available() else "CPU only")
+    registry = ModelRegistry(device)
+    alz_sag_50 = registry.get("alzheimer", "mri_sagittal_r50")
+    alz_sag_101 = registry.get("alzheimer", "mri_sagittal")
     evaluate_ensemble(alz_sag_50, alz_sag_101, sagittal_loader, alz_classes)
 
@@ -1,29 +1,10 @@
 import torch
-import torch.nn as nn
 from sklearn.metrics import accuracy_score, classification_report
-import torchvision.models as models
 
 from constants.constants import park_classes
-from dataloaders.ensemble_dataloader import parkinson_loader
-from dataloaders.drawings_dataloader import drawing_loader, drawing_classes
-from models.model_defs import ResNetModel, ResNet101_MRI
+from models.model_registry import ModelRegistry
 
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-print(torch.cuda.is_available())
-print(torch.cuda.get_device_name() if torch.cuda.is_available() else "CPU only")
-
-park_50 = ResNetModel(pretrained=False, num_classes=4)
-park_50.load_state_dict(torch.load("models/ResNet_Parkinson_Multiclass.pth", map_location=device))
-park_50.to(device).eval()
-
-park_101 = ResNet101_MRI(pretrained=False, num_classes=4)
-park_101.load_state_dict(torch.load("models/ResNet101_Parkinson_Multiclass.pth", map_location=device))
-park_101.to(device).eval()
-
-drawing_model = models.resnet50(weights=None)
-drawing_model.fc = nn.Linear(drawing_model.fc.in_features, 2)
-drawing_model.load_state_dict(torch.load("models/resnet50_parkinson.pth", map_location=device))
-drawing_model.to(device).eval()
 
 
 def evaluate_ensemble(model_r50, model_r101, dataloader, class_names, w_r50=0.5, w_r101=0.5,
@@ -71,6 +52,14 @@ def evaluate_drawing_model(model, dataloader, class_names, path="drawing_parkins
 
 
 if __name__ == "__main__":
+    from dataloaders.ensemble_dataloader import parkinson_loader
+    from dataloaders.drawings_dataloader import drawing_loader, drawing_classes
+
+    print(torch.cuda.get_device_name() if torch.cuda.is_available() else "CPU only")
+    registry = ModelRegistry(device)
+    park_50 = registry.get("parkinson", "general")
+    park_101 = registry.get("parkinson", "mri")
+    drawing_model = registry.get("parkinson", "drawing")
     evaluate_ensemble(park_50, park_101, parkinson_loader, park_classes)
     evaluate_drawing_model(drawing_model, drawing_loader, drawing_classes)
 
@@ -0,0 +1,56 @@
+import torch
+from sklearn.metrics import accuracy_score
+
+from dataloaders.drawings_dataloader import drawing_loader
+from dataloaders.ensemble_dataloader import axial_loader, sagittal_loader, parkinson_loader
+from models.export import measure_latency_ms
+from models.model_loader import get_model_spec, load_model_for
+from models.quantization import quantize_static, save_quantized, quantized_path_for
+
+CALIBRATION_BATCHES = 10
+LATENCY_RUNS = 20
+
+QUANTIZATION_TARGETS = {
+    ("alzheimer", "mri_axial"): axial_loader,
+    ("alzheimer", "mri_axial_r50"): axial_loader,
+    ("alzheimer", "mri_sagittal"): sagittal_loader,
+    ("alzheimer", "mri_sagittal_r50"): sagittal_loader,
+    ("parkinson", "mri"): parkinson_loader,
+    ("parkinson", "general"): parkinson_loader,
+    ("parkinson", "drawing"): drawing_loader,
+}
+
+
+def evaluate_accuracy(model, dataloader):
+    all_preds, all_labels = [], []
+    with torch.inference_mode():
+        for images, labels in dataloader:
+            _, preds = torch.max(model(images), dim=1)
+            all_preds.extend(preds.numpy())
+            all_labels.extend(labels.numpy())
+    return accuracy_score(all_labels, all_preds)
+
+
+if __name__ == "__main__":
+    lines = []
+    for (disease, modality), loader in QUANTIZATION_TARGETS.items():
+        model_path = get_model_spec(disease, modality)[0]
+        model_fp32 = load_model_for(disease, modality, "cpu")
+        model_int8 = quantize_static(model_fp32, loader, num_batches=CALIBRATION_BATCHES)
+
+        example_input = next(iter(loader))[0][:1]
+        save_quantized(model_int8, example_input, quantized_path_for(model_path))
+
+        acc_fp32 = evaluate_accuracy(model_fp32, loader)
+        acc_int8 = evaluate_accuracy(model_int8, loader)
+        ms_fp32 = measure_latency_ms(model_fp32, (example_input,), LATENCY_RUNS)
+        ms_int8 = measure_latency_ms(model_int8, (example_input,), LATENCY_RUNS)
+
+        line = (f"{disease}/{modality}: accuracy {acc_fp32 * 100:.2f}% -> {acc_int8 * 100:.2f}% "
+                f"(delta {(acc_int8 - acc_fp32) * 100:+.2f}), latency {ms_fp32:.1f} ms -> {ms_int8:.1f} ms "
+                f"(x{ms_fp32 / ms_int8:.2f})")
+        print(line)
+        lines.append(line)
+
+    with open("quantization_report.txt", "w") as f:
+        f.write("FP32 vs INT8 (static PTQ, fbgemm, batch size 1 latency)\n\n" + "\n".join(lines) + "\n")
@@ -0,0 +1,194 @@
+import copy
+import threading
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from pytorch_grad_cam import AblationCAM, ScoreCAM, GradCAM
+from pytorch_grad_cam.base_cam import BaseCAM
+from pytorch_grad_cam.utils.model_targets import ClassifierOutputTarget
+
+from constants.constants import CAM_BATCH_SIZE, CAM_CHANNEL_BUDGET
+
+MUTATING_KINDS = ("ablation", "ablation_fast")
+
+
+class FastScoreCAM(BaseCAM):
+    def __init__(self, model, target_layers, batch_size=CAM_BATCH_SIZE, channel_budget=CAM_CHANNEL_BUDGET):
+        super(FastScoreCAM, self).__init__(model, target_layers, uses_gradients=False)
+        self.batch_size = batch_size
+        self.channel_budget = channel_budget
+
+    def get_cam_weights(self, input_tensor, target_layer, targets, activations, grads):
+        with torch.no_grad():
+            activation_tensor = torch.from_numpy(activations).to(self.device)
+            weights = np.zeros(activations.shape[:2], dtype=np.float32)
+            k = min(self.channel_budget, activation_tensor.shape[1])
+            top_channels = activation_tensor.flatten(2).var(dim=-1).topk(k, dim=1).indices
+
+            for n, target in enumerate(targets):
+                channels = top_channels[n]
+                maps = F.interpolate(
+                    activation_tensor[n, channels][None],
+                    size=input_tensor.shape[-2:],
+                    mode="bilinear",
+                    align_corners=True
+                )[0]
+                flat = maps.flatten(1)
+                mins = flat.min(dim=-1)[0][:, None, None]
+                maxs = flat.max(dim=-1)[0][:, None, None]
+                maps = (maps - mins) / (maxs - mins + 1e-8)
+
+                scores = []
+                for i in range(0, k, self.batch_size):
+                    batch = input_tensor[n][None] * maps[i:i + self.batch_size, None]
+                    scores.extend(target(output).cpu().item() for output in self.model(batch))
+
+                weights[n, channels.cpu().numpy()] = torch.softmax(torch.tensor(scores), dim=-1).numpy()
+            return weights
+
+
+def get_target_layers(model):
+    try:
+        target_layers = [
+            model.resnet.layer2[-1],
+            model.resnet.layer3[-1],
+            model.resnet.layer4[-1]
+        ]
+        cam_model = model.resnet
+    except AttributeError:
+        target_layers = [model.layer3[-1]]
+        cam_model = model
+    return cam_model, target_layers
+
+
+def get_cam_kind(modality, mode="full"):
+    if mode == "gradcam":
+        return "gradcam"
+    if modality == "mri_axial":
+        kind = "ablation"
+    elif modality in ("mri_sagittal", "mri"):
+        kind = "score"
+    else:
+        return "gradcam"
+    return f"{kind}_fast" if mode == "fast" else kind
+
+
+def build_cam(kind, cam_model, target_layers):
+    if kind == "ablation":
+        return AblationCAM(model=cam_model, target_layers=target_layers)
+    elif kind == "ablation_fast":
+        max_channels = max(layer_channels(layer) for layer in target_layers)
+        return AblationCAM(
+            model=cam_model,
+            target_layers=target_layers,
+            batch_size=CAM_BATCH_SIZE,
+            ratio_channels_to_ablate=min(1.0, CAM_CHANNEL_BUDGET / max_channels)
+        )
+    elif kind == "score":
+        return ScoreCAM(model=cam_model, target_layers=target_layers)
+    elif kind == "score_fast":
+        return FastScoreCAM(model=cam_model, target_layers=target_layers)
+    else:
+        return GradCAM(model=cam_model, target_layers=target_layers)
+
+
+def layer_channels(layer):
+    convs = [module for module in layer.modules() if isinstance(module, torch.nn.Conv2d)]
+    return convs[-1].out_channels
+
+
+class CamEngine:
+    def __init__(self, model, kind, lock=None, cam_source=None):
+        self.model = model
+        self.kind = kind
+        cam_model, target_layers = get_target_layers(cam_source if cam_source is not None else model)
+        self.cam = build_cam(kind, cam_model, target_layers)
+        self.lock = lock or threading.Lock()
+        self.owner = None
+
+        activations = self.cam.activations_and_grads
+        activations.release()
+        activations.handles = []
+        for layer in target_layers:
+            activations.handles.append(layer.register_forward_hook(self._gated(activations.save_activation)))
+            activations.handles.append(layer.register_forward_hook(self._gated(activations.save_gradient)))
+
+    def _gated(self, hook):
+        def gated_hook(module, input, output):
+            if self.owner == threading.get_ident():
+                return hook(module, input, output)
+        return gated_hook
+
+    def __call__(self, input_tensor, pred_class_idx):
+        device = input_tensor.device
+        with self.lock:
+            self.owner = threading.get_ident()
+            try:
+                with torch.inference_mode(not self.cam.uses_gradients), \
+                        torch.amp.autocast(device_type=device.type, enabled=device.type == 'cuda'):
+                    return self.cam(input_tensor=input_tensor, targets=[ClassifierOutputTarget(pred_class_idx)])[0]
+            finally:
+                self.owner = None
+
+    def release(self):
+        with self.lock:
+            self.cam.activations_and_grads.release()
+
+
+_engines = {}
+_model_locks = {}
+_isolated_models = {}
+_engines_lock = threading.Lock()
+_isolation_hook = None
+
+
+def set_isolation_hook(hook):
+    global _isolation_hook
+    _isolation_hook = hook
+
+
+def _drop_stale(model):
+    stale = [k for k, e in _engines.items() if k[0] == id(model) and e.model is not model]
+    isolated = _isolated_models.get(id(model))
+    if stale or (isolated is not None and isolated[0] is not model):
+        for k in stale:
+            _engines.pop(k)
+        _model_locks.pop(id(model), None)
+        _isolated_models.pop(id(model), None)
+
+
+def get_cam_engine(model, modality, mode="full"):
+    kind = get_cam_kind(modality, mode)
+    key = (id(model), kind)
+    isolated = None
+    while True:
+        with _engines_lock:
+            _drop_stale(model)
+            engine = _engines.get(key)
+            if engine is not None:
+                return engine
+            if kind not in MUTATING_KINDS or isolated is not None or id(model) in _isolated_models:
+                lock = _model_locks.setdefault(id(model), threading.Lock())
+                cam_source = None
+                if kind in MUTATING_KINDS:
+                    cam_source = _isolated_models.setdefault(id(model), (model, isolated))[1]
+                engine = CamEngine(model, kind, lock, cam_source)
+                _engines[key] = engine
+                break
+        isolated = copy.deepcopy(model)
+
+    if isolated is not None and cam_source is isolated and _isolation_hook:
+        _isolation_hook(model, isolated)
+    return engine
+
+
+def release_cam_engines(model=None):
+    with _engines_lock:
+        keys = [key for key, engine in _engines.items() if model is None or engine.model is model]
+        engines = [_engines.pop(key) for key in keys]
+        for engine in engines:
+            _model_locks.pop(id(engine.model), None)
+            _isolated_models.pop(id(engine.model), None)
+    for engine in engines:
+        engine.release()
@@ -0,0 +1,124 @@
+import itertools
+import json
+import queue
+import sqlite3
+import threading
+import time
+import traceback
+
+
+class CamJobStore:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cam_jobs (id TEXT PRIMARY KEY, job TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def save(self, job_id, job):
+        with self.lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cam_jobs (id, job, updated_at) VALUES (?, ?, ?)",
+                (job_id, json.dumps(job), time.time())
+            )
+
+    def load(self, job_id):
+        with self.lock, self._connect() as conn:
+            row = conn.execute("SELECT job FROM cam_jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def evict(self, older_than):
+        with self.lock, self._connect() as conn:
+            conn.execute("DELETE FROM cam_jobs WHERE updated_at < ?", (older_than,))
+
+
+class CamJobQueue:
+    def __init__(self, workers=2, max_queue=64, ttl_s=3600, store_path=None):
+        self.ttl_s = ttl_s
+        self.queue = queue.PriorityQueue(maxsize=max_queue)
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.counter = itertools.count()
+        self.store = CamJobStore(store_path) if store_path else None
+        self.last_eviction = time.time()
+
+        for i in range(workers):
+            threading.Thread(target=self._worker, name=f"cam-worker-{i}", daemon=True).start()
+
+    def _save(self, job_id, **updates):
+        with self.lock:
+            job = self.jobs.setdefault(job_id, {})
+            job.update(updates)
+            snapshot = dict(job)
+        if self.store:
+            self.store.save(job_id, snapshot)
+
+    def submit(self, job_id, fn, *args, priority=10):
+        self._save(job_id, status="queued", priority=priority, submitted_at=time.time())
+        try:
+            self.queue.put_nowait((priority, next(self.counter), job_id, fn, args))
+        except queue.Full:
+            self._save(job_id, status="failed", error="CAM queue is full", finished_at=time.time())
+
+    def _worker(self):
+        while True:
+            _, _, job_id, fn, args = self.queue.get()
+            started_at = time.time()
+            self._save(job_id, status="running", started_at=started_at)
+            try:
+                result = fn(*args)
+                self._save(job_id, status="done", result=result, finished_at=time.time())
+            except Exception as e:
+                traceback.print_exc()
+                self._save(job_id, status="failed", error=str(e), finished_at=time.time())
+            finally:
+                self.queue.task_done()
+            self._evict_expired()
+
+    def _evict_expired(self):
+        now = time.time()
+        if now - self.last_eviction < 60:
+            return
+        self.last_eviction = now
+        cutoff = now - self.ttl_s
+        with self.lock:
+            expired = [job_id for job_id, job in self.jobs.items() if job.get("finished_at", now) < cutoff]
+            for job_id in expired:
+                del self.jobs[job_id]
+        if self.store:
+            self.store.evict(cutoff)
+
+    def status(self, job_id):
+        with self.lock:
+            job = dict(self.jobs[job_id]) if job_id in self.jobs else None
+        if job is None and self.store:
+            job = self.store.load(job_id)
+        if job is None:
+            return {"status": "not_found"}
+
+        response = {"status": job["status"]}
+        if job["status"] == "done":
+            response.update(job["result"])
+        if job["status"] == "failed":
+            response["error"] = job.get("error")
+
+        timing = {}
+        if "started_at" in job:
+            timing["queued_s"] = round(job["started_at"] - job["submitted_at"], 3)
+        if "finished_at" in job and "started_at" in job:
+            timing["running_s"] = round(job["finished_at"] - job["started_at"], 3)
+        if timing:
+            response["timing"] = timing
+        return response
+
+    def stats(self):
+        with self.lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {"queue_depth": self.queue.qsize(), "jobs": counts}
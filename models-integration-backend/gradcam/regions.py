@@ -0,0 +1,76 @@
+from functools import lru_cache
+
+import numpy as np
+from scipy import ndimage
+
+SAGITTAL_REGIONS = ["frontal lobe", "hippocampal/parietal", "occipital lobe"]
+AXIAL_REGIONS = ["frontal lobe", "temporal lobe", "occipital/parietal lobe"]
+
+
+def region_names_for(modality):
+    return SAGITTAL_REGIONS if modality == "mri_sagittal" else AXIAL_REGIONS
+
+
+def _readonly(array):
+    array.setflags(write=False)
+    return array
+
+
+@lru_cache(maxsize=32)
+def region_labels(modality, shape):
+    h, w = shape
+    labels = np.empty((h, w), dtype=np.int32)
+    if modality == "mri_sagittal":
+        labels[:, :int(w * 0.33)] = 0
+        labels[:, int(w * 0.33):int(w * 0.66)] = 1
+        labels[:, int(w * 0.66):] = 2
+    else:
+        labels[:int(h * 0.33), :] = 0
+        labels[int(h * 0.33):int(h * 0.66), :] = 1
+        labels[int(h * 0.66):, :] = 2
+    return _readonly(labels)
+
+
+@lru_cache(maxsize=32)
+def brain_mask(modality, shape):
+    h, w = shape
+    mask = np.ones((h, w), dtype=np.float32)
+    if modality == "mri_axial":
+        mask[:int(h * 0.1), :] = 0
+        mask[int(h * 0.93):, :] = 0
+        mask[:, :int(w * 0.1)] = 0
+        mask[:, int(w * 0.9):] = 0
+    else:
+        mask[int(h * 0.7):, :] = 0
+    return _readonly(mask)
+
+
+def ensemble_mask(mask_type, shape):
+    return brain_mask("mri_axial" if mask_type == "axial" else "mri_sagittal", shape)
+
+
+def region_statistics(cams, modality):
+    cams = np.asarray(cams, dtype=np.float32)
+    if cams.ndim == 2:
+        cams = cams[None]
+    n, h, w = cams.shape
+    labels = region_labels(modality, (h, w))
+    num_regions = len(region_names_for(modality))
+
+    batch_labels = (labels[None] + num_regions * np.arange(n)[:, None, None]).ravel()
+    counts = np.bincount(labels.ravel(), minlength=num_regions)
+    sums = np.bincount(batch_labels, weights=cams.ravel(), minlength=n * num_regions).reshape(n, num_regions)
+    peaks = ndimage.maximum(cams.ravel(), batch_labels, np.arange(n * num_regions))
+    return sums / counts, np.asarray(peaks).reshape(n, num_regions)
+
+
+def region_scores_batch(cams, modality):
+    means, peaks = region_statistics(cams, modality)
+    names = region_names_for(modality)
+    return [
+        {
+            name: {"average": round(float(avg), 3), "peak": round(float(peak), 3)}
+            for name, avg, peak in zip(names, row_means, row_peaks)
+        }
+        for row_means, row_peaks in zip(means, peaks)
+    ]
@@ -1,32 +1,41 @@
-import threading
 import uuid
-from datetime import datetime
 
-import cv2
-import numpy as np
-from fastapi import FastAPI, UploadFile, File, Form
-import shutil, os
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+import os
 import torch
 
-from contour.tremor_heatmap import analyze_drawing_quality
+from contour.tremor_heatmap import DRAWING_ARTIFACTS, drawing_metrics, render_drawing_artifact
 
 torch.backends.cudnn.benchmark = True
-from matplotlib import pyplot as plt
+from starlette.responses import FileResponse
 from starlette.staticfiles import StaticFiles
 from torchvision import transforms
-from PIL import Image
-from concurrent.futures import ThreadPoolExecutor
-
-from constants.constants import alz_classes, park_classes
-from evaluation.eval_alzheimer_axial import alz_ax_50, alz_ax_101
-from evaluation.eval_alzheimer_sagittal import alz_sag_50, alz_sag_101
-from evaluation.eval_parkinson import park_50, park_101
-from gradcam.gradcam import generate_cam_combined, mask_non_brain_regions, mask_non_brain_regions_ensemble
-from models.model_loader import load_model_for
-from transforms.transform_utils import get_transform_for
-from utils.audio_utils import load_audio_and_spectrogram
-from evaluation.eval_ensemble_all import predict_with_ensemble_fixed
-from utils.predict_utils import predict_image_with_model
+
+from constants.constants import alz_classes, park_classes, audio_classes, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, \
+    BATCH_MAX_QUEUE, INFERENCE_WORKERS, INFERENCE_MAX_PENDING, ENSEMBLE_CASCADE, MODEL_WARMUP, \
+    MODEL_MEMORY_BUDGET_MB, MODEL_VARIANTS, USE_EXPORTED_MODELS, CAM_WORKERS, CAM_MAX_QUEUE, CAM_RESULT_TTL_S, \
+    CAM_STORE_PATH, CAM_PRIORITY_PREDICT, CAM_PRIORITY_ENSEMBLE, CAM_PRIORITY_ENSEMBLE_FUSION, CAM_MODE, \
+    CAM_FALLBACK_QUEUE_DEPTH, ENSEMBLE_CAM_FUSION, ENSEMBLE_CAM_WEIGHTS, RESULT_CACHE_SIZE, RESULT_CACHE_TTL_S, \
+    RESULT_CACHE_PATH, ARTIFACT_FORMAT, ARTIFACT_SOURCE_CACHE_SIZE, FEATURE_INDEX_PATH, FEATURE_INDEX_SIZE, \
+    FEATURE_INDEX_MAX_STORED, AUDIO_SEGMENT_LEN, AUDIO_SEGMENT_BATCH, AUDIO_MAX_SEGMENTS, PACKED_FEATURES_ROOT
+from evaluation.ensemble_utils import load_cascade_thresholds
+from gradcam.cam_engine import release_cam_engines, set_isolation_hook
+from gradcam.cam_jobs import CamJobQueue
+from gradcam.gradcam import generate_cam_combined, generate_cam_ensemble
+from models.model_registry import ModelRegistry
+from transforms.transform_utils import get_transform_for, preprocess_shared
+from utils import artifact_renderer
+from utils.artifact_sources import ArtifactSources
+from utils.audio_stream import classify_recording
+from utils.audio_utils import segment_features
+from utils.feature_index import FeatureIndex
+from utils.feature_shards import PackedFeatureStore
+from utils.batching import MicroBatcher
+from utils.ensemble_engine import EnsembleEngine
+from utils.inference_pool import InferencePool, ServerBusy
+from utils.predict_utils import predict_batch_with_model
+from utils.result_cache import ResultCache, result_key
+from utils.upload_utils import read_upload
 
 app = FastAPI(
     title="Neurodegenerative Disease Classifier API",
@@ -36,23 +45,261 @@ app = FastAPI(
     redoc_url="/redoc",
     openapi_url="/openapi.json"
 )
-executor = ThreadPoolExecutor(max_workers=4)
-
-MODEL_CACHE = {}
-
-def get_cached_model(disease, modality, device):
-    key = f"{disease}_{modality}"
-    if key not in MODEL_CACHE:
-        MODEL_CACHE[key] = load_model_for(disease, modality, device)
-    return MODEL_CACHE[key]
+inference_pool = InferencePool(max_workers=INFERENCE_WORKERS, max_pending=INFERENCE_MAX_PENDING)
 
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 print(torch.cuda.is_available())
 print(torch.cuda.get_device_name() if torch.cuda.is_available() else "CPU only")
 
+model_registry = ModelRegistry(
+    device,
+    memory_budget_mb=MODEL_MEMORY_BUDGET_MB,
+    variants=MODEL_VARIANTS,
+    default_variant="torchscript" if USE_EXPORTED_MODELS else "fp32",
+    on_evict=release_cam_engines
+)
+set_isolation_hook(model_registry.track_copy)
+
+def get_cached_model(disease, modality, device):
+    return model_registry.get(disease, modality)
+
+os.makedirs("temp", exist_ok=True)
 app.mount("/static", StaticFiles(directory="temp"), name="static")
 
-PREDICTION_CACHE = {}
+cam_jobs = CamJobQueue(
+    workers=CAM_WORKERS,
+    max_queue=CAM_MAX_QUEUE,
+    ttl_s=CAM_RESULT_TTL_S,
+    store_path=CAM_STORE_PATH
+)
+
+result_cache = ResultCache(
+    max_entries=RESULT_CACHE_SIZE,
+    ttl_s=RESULT_CACHE_TTL_S,
+    store_path=RESULT_CACHE_PATH
+)
+
+if FEATURE_INDEX_PATH:
+    os.makedirs(os.path.dirname(FEATURE_INDEX_PATH), exist_ok=True)
+feature_index = FeatureIndex(
+    FEATURE_INDEX_PATH,
+    max_entries=FEATURE_INDEX_SIZE,
+    max_stored=FEATURE_INDEX_MAX_STORED,
+    packed_store=PackedFeatureStore(PACKED_FEATURES_ROOT) if PACKED_FEATURES_ROOT else None
+)
+drawing_sources = ArtifactSources(max_entries=ARTIFACT_SOURCE_CACHE_SIZE)
+RESULTS_DIR = os.path.join("temp", "results")
+os.makedirs(RESULTS_DIR, exist_ok=True)
+
+ENSEMBLE_INPUTS = [("alzheimer", "axial"), ("alzheimer", "sagittal"), ("parkinson", "drawing")]
+ENSEMBLE_MEMBERS = {
+    "Alzheimer Axial": (("alzheimer", "mri_axial_r50"), ("alzheimer", "mri_axial"), alz_classes),
+    "Alzheimer Sagittal": (("alzheimer", "mri_sagittal_r50"), ("alzheimer", "mri_sagittal"), alz_classes),
+    "Parkinson": (("parkinson", "general"), ("parkinson", "mri"), park_classes)
+}
+CASCADE_THRESHOLDS = load_cascade_thresholds() if ENSEMBLE_CASCADE else None
+
+
+def run_mri_batch(key, input_tensors):
+    disease, modality = key
+    model = get_cached_model(disease, modality, device)
+    class_names = alz_classes if disease == "alzheimer" else park_classes
+    return predict_batch_with_model(model, torch.stack(input_tensors), class_names, device)
+
+
+mri_batcher = MicroBatcher(
+    run_mri_batch,
+    max_batch_size=BATCH_MAX_SIZE,
+    max_wait_ms=BATCH_MAX_WAIT_MS,
+    max_queue_size=BATCH_MAX_QUEUE,
+    executor=inference_pool.executor
+)
+
+ensemble_engine = EnsembleEngine(
+    ENSEMBLE_MEMBERS,
+    model_registry,
+    device,
+    inference_pool.executor,
+    max_batch_size=BATCH_MAX_SIZE,
+    max_wait_ms=BATCH_MAX_WAIT_MS,
+    max_queue_size=BATCH_MAX_QUEUE
+)
+
+
+def predict_audio(upload, disease, modality, prediction_id):
+    model = get_cached_model(disease, modality, device)
+    recording = classify_recording(
+        model, upload.stream(), device,
+        segment_len=AUDIO_SEGMENT_LEN,
+        batch_size=AUDIO_SEGMENT_BATCH,
+        max_segments=AUDIO_MAX_SEGMENTS
+    )
+    if recording["probabilities"] is None:
+        raise ValueError("Audio recording is empty")
+
+    _, mel_tensor, freqs, times, energy, pitch, energy_stats, pitch_stats = segment_features(
+        recording["display_segment"], 16000, feature_index
+    )
+
+    image_filename = f"{prediction_id}_spectrogram.{ARTIFACT_FORMAT}"
+    artifact_renderer.write(
+        os.path.join("temp", image_filename),
+        artifact_renderer.colorize(mel_tensor.numpy(), cmap="magma", size=(800, 400), origin_lower=True)
+    )
+
+    probs = recording["probabilities"]
+    pred_idx = int(probs.argmax())
+
+    class_names = audio_classes
+
+    return {
+        "prediction_id": prediction_id,
+        "predicted_class": class_names[pred_idx],
+        "confidence": float(probs[pred_idx]),
+        "probabilities": {
+            class_names[i]: float(probs[i]) for i in range(len(class_names))
+        },
+        "spectrogram_url": f"/static/{image_filename}",
+        "segments": {
+            "total": recording["total_segments"],
+            "voiced": len(recording["voiced_indices"]),
+            "predictions": [
+                {
+                    "start_s": index * AUDIO_SEGMENT_LEN / 16000,
+                    "predicted_class": class_names[int(segment_probs.argmax())],
+                    "confidence": float(segment_probs.max())
+                }
+                for index, segment_probs in zip(recording["voiced_indices"], recording["segment_probabilities"])
+            ]
+        },
+        "mel_shape": list(mel_tensor.unsqueeze(0).shape),
+        "freqs": freqs.tolist(),
+        "times": times.tolist(),
+        "freq_range": [
+            round(float(freqs[0])),
+            round(float(freqs[-1]))
+        ],
+        "time_range": [
+            round(float(times[0]), 2),
+            round(float(times[-1]), 2)
+        ],
+        "energy_contour": energy,
+        "pitch_contour": pitch,
+        "energy_stats": energy_stats,
+        "pitch_stats": pitch_stats
+    }
+
+
+def predict_drawing(upload, disease, modality, prediction_id):
+    transform = transforms.Compose([
+        transforms.Resize((224, 224)),
+        transforms.ToTensor(),
+        transforms.Normalize([0.5], [0.5])
+
+    ])
+
+    input_tensor = transform(upload.rgb).unsqueeze(0).to(device)
+    model = get_cached_model(disease, modality, device)
+    class_names = ["Healthy", "Parkinson"]
+    with torch.no_grad():
+        output = model(input_tensor)
+        probs = torch.softmax(output, dim=1)[0]
+        pred_idx = probs.argmax().item()
+
+    result_analysis = drawing_metrics(upload.gray, upload.filename)
+    drawing_sources.put(prediction_id, upload.gray)
+
+    return {
+        "prediction_id": prediction_id,
+        "predicted_class": class_names[pred_idx],
+        "confidence": float(probs[pred_idx]),
+        "probabilities": {
+            class_names[i]: float(probs[i]) for i in range(len(class_names))
+        },
+        "fft_url": f"/artifacts/{prediction_id}/fft",
+        "fft_radial_url": f"/artifacts/{prediction_id}/fft_radial",
+        "contours_url": f"/artifacts/{prediction_id}/contours",
+        "tremor_overlay_url": f"/artifacts/{prediction_id}/tremor_camstyle",
+        "drawing_index": {
+            "metrics": result_analysis["metrics"],
+            "description": "Pixel-level metrics + soft Grad-CAM-like tremor overlay",
+            "shape_type": result_analysis["shape_type"]
+        }
+    }
+
+
+def prepare_mri_input(upload, disease, modality):
+    transform = get_transform_for(disease, modality)
+    return transform(upload.rgb)
+
+
+def prepare_ensemble_input(upload):
+    inputs = preprocess_shared(upload.rgb, ENSEMBLE_INPUTS)
+    return dict(zip(ENSEMBLE_MEMBERS, inputs))
+
+
+def build_ensemble_response(image, inputs, predictions, prediction_id):
+    _, label_ax, score_ax = predictions["Alzheimer Axial"]
+    _, label_sag, score_sag = predictions["Alzheimer Sagittal"]
+    _, label_park, score_park = predictions["Parkinson"]
+
+    all_preds = [
+        ("Alzheimer Axial", label_ax, score_ax),
+        ("Alzheimer Sagittal", label_sag, score_sag),
+        ("Parkinson", label_park, score_park)
+    ]
+    best = max(all_preds, key=lambda x: x[2])
+    best_name, best_label, best_score = best
+    if "Axial" in best_name:
+        disease = "alzheimer"
+        modality = "mri_axial"
+    elif "Sagittal" in best_name:
+        disease = "alzheimer"
+        modality = "mri_sagittal"
+    elif "Parkinson" in best_name:
+        disease = "parkinson"
+        modality = "mri_sagittal"
+    else:
+        raise Exception(f"Unknown best_name: {best_name}")
+
+    r50_key, r101_key, _ = ENSEMBLE_MEMBERS[best_name]
+    if ENSEMBLE_CAM_FUSION:
+        cam_jobs.submit(
+            prediction_id, generate_cam_ensemble_async, [r50_key, r101_key], image, device, disease, modality,
+            predictions[best_name][0], inputs[best_name].unsqueeze(0), priority=CAM_PRIORITY_ENSEMBLE_FUSION
+        )
+    else:
+        cam_jobs.submit(
+            prediction_id, generate_cam_async, r101_key, image, device, disease, modality,
+            predictions[best_name][0], inputs[best_name].unsqueeze(0), priority=CAM_PRIORITY_ENSEMBLE
+        )
+
+    return {
+        "prediction_id": prediction_id,
+        "predicted_disease": best_name,
+        "predicted_class": best_label,
+        "score": round(best_score * 100, 2),
+        "all_predictions": {
+            "Alzheimer Axial": (label_ax, round(score_ax * 100, 2)),
+            "Alzheimer Sagittal": (label_sag, round(score_sag * 100, 2)),
+            "Parkinson": (label_park, round(score_park * 100, 2))
+        }
+    }
+
+
+def lookup_cached_result(upload, disease, modality):
+    cache_key = result_key(upload.sha256, disease, modality, model_registry.version_for(disease, modality))
+    cached = result_cache.get(cache_key)
+    if cached is None:
+        return cache_key, None
+    if modality not in ("audio", "drawing") and cam_jobs.status(cached["prediction_id"])["status"] in ("not_found", "failed"):
+        result_cache.discard(cache_key)
+        return cache_key, None
+    if modality == "drawing":
+        drawing_sources.put(cached["prediction_id"], upload.gray)
+    cached["cached"] = True
+    return cache_key, cached
+
 
 @app.post("/predict")
 async def predict(
@@ -61,134 +308,34 @@ async def predict(
     modality: str = Form(...),
 ):
     prediction_id = str(uuid.uuid4())
-    temp_path = f"temp/{prediction_id}_{file.filename}"
-    os.makedirs("temp", exist_ok=True)
-
-    with open(temp_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
 
     try:
-        if modality == "audio":
-            import librosa.display
-            import matplotlib.pyplot as plt
-
-            audio_tensor, mel_tensor, freqs, times, energy, pitch, energy_stats, pitch_stats = load_audio_and_spectrogram(
-                wav_path=temp_path,
-                spec_root="D:/Licenta/Datasets/Audio/data/MelSpectrograms/test"
-            )
-
-            image_filename = f"{prediction_id}_spectrogram.png"
-            image_path = os.path.join("temp", image_filename)
-
-            plt.figure(figsize=(8, 4))
-            librosa.display.specshow(
-                mel_tensor.numpy(),
-                sr=16000,
-                hop_length=512,
-                x_axis='time',
-                y_axis='mel',
-                cmap='magma'
-            )
-            plt.title("Mel Spectrogram")
-            plt.colorbar(format='%+2.0f dB')
-            plt.tight_layout()
-            plt.savefig(image_path)
-            plt.close()
-
-            model = get_cached_model(disease, modality, device)
-            audio_tensor = audio_tensor.unsqueeze(0).to(device)
-            mel_tensor = mel_tensor.unsqueeze(0).to(device)
-
-            with torch.no_grad():
-                output = model(audio_tensor, mel_tensor)
-                probs = torch.softmax(output, dim=1)[0]
-                pred_idx = probs.argmax().item()
-
-            class_names = ["Alzheimer", "Parkinson", "Healthy"]
-
-            result = {
-                "prediction_id": prediction_id,
-                "predicted_class": class_names[pred_idx],
-                "confidence": float(probs[pred_idx]),
-                "probabilities": {
-                    class_names[i]: float(probs[i]) for i in range(len(class_names))
-                },
-                "spectrogram_url": f"/static/{image_filename}",
-                "mel_shape": mel_tensor.shape,
-                "freqs": freqs.tolist(),
-                "times": times.tolist(),
-                "freq_range": [
-                    round(float(freqs[0])),
-                    round(float(freqs[-1]))
-                ],
-                "time_range": [
-                    round(float(times[0]), 2),
-                    round(float(times[-1]), 2)
-                ],
-                "energy_contour": energy,
-                "pitch_contour": pitch,
-                "energy_stats": energy_stats,
-                "pitch_stats": pitch_stats
-            }
-
+        upload = read_upload(file)
+        cache_key, cached = await inference_pool.run(lookup_cached_result, upload, disease, modality)
+        if cached is not None:
+            return cached
 
+        if modality == "audio":
+            result = await inference_pool.run(predict_audio, upload, disease, modality, prediction_id)
 
         elif modality == "drawing":
-            transform = transforms.Compose([
-                transforms.Resize((224, 224)),
-                transforms.ToTensor(),
-                transforms.Normalize([0.5], [0.5])
-
-            ])
-
-            image = Image.open(temp_path).convert("RGB")
-            input_tensor = transform(image).unsqueeze(0).to(device)
-            model = get_cached_model(disease, modality, device)
-            class_names = ["Healthy", "Parkinson"]
-            with torch.no_grad():
-                output = model(input_tensor)
-                probs = torch.softmax(output, dim=1)[0]
-                pred_idx = probs.argmax().item()
-
-            results_dir = os.path.join("temp", "results")
-            os.makedirs(results_dir, exist_ok=True)
-            output_prefix = os.path.join(results_dir, f"{prediction_id}_drawing")
-
-            result_analysis = analyze_drawing_quality(
-                image_path=temp_path,
-                output_prefix=output_prefix,
-                prediction_id=prediction_id
-            )
-
-            result = {
-                "prediction_id": prediction_id,
-                "predicted_class": class_names[pred_idx],
-                "confidence": float(probs[pred_idx]),
-                "probabilities": {
-                    class_names[i]: float(probs[i]) for i in range(len(class_names))
-                },
-                "fft_url": f"/static/results/{prediction_id}_drawing_fft.png",
-                "fft_radial_url": f"/static/results/{prediction_id}_drawing_fft_radial.png",
-                "contours_url": f"/static/results/{prediction_id}_drawing_contours.png",
-                "tremor_overlay_url": f"/static/results/{prediction_id}_drawing_tremor_camstyle.png",
-                "drawing_index": {
-                    "metrics": result_analysis["metrics"],
-                    "description": "Pixel-level metrics + soft Grad-CAM-like tremor overlay",
-                    "shape_type": result_analysis["shape_type"]
-                }
-            }
+            result = await inference_pool.run(predict_drawing, upload, disease, modality, prediction_id)
 
         else:
-            model = get_cached_model(disease, modality, device)
-            transform = get_transform_for(disease, modality)
-            class_names = (
-                alz_classes if disease == "alzheimer" else park_classes
-            )
-            result = predict_image_with_model(model, temp_path, class_names, device, transform)
+            input_tensor = await inference_pool.run(prepare_mri_input, upload, disease, modality)
+            result = await mri_batcher.submit((disease, modality), input_tensor)
             result["prediction_id"] = prediction_id
             result["confidence"] = float(result["probabilities"][result["predicted_class"]])
-            executor.submit(generate_cam_async, model, temp_path, device, disease, modality, prediction_id)
+            class_names = alz_classes if disease == "alzheimer" else park_classes
+            cam_jobs.submit(
+                prediction_id, generate_cam_async, (disease, modality), upload.rgb, device, disease, modality,
+                class_names.index(result["predicted_class"]), input_tensor.unsqueeze(0), priority=CAM_PRIORITY_PREDICT
+            )
 
+        result_cache.put(cache_key, result)
+
+    except ServerBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         return {"error": str(e)}
     return result
@@ -197,121 +344,119 @@ async def predict(
 @app.post("/predict-ensemble")
 async def predict_auto(file: UploadFile = File(...)):
     prediction_id = str(uuid.uuid4())
-    temp_path = f"temp/{prediction_id}_{file.filename}"
-    os.makedirs("temp", exist_ok=True)
 
-    with open(temp_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
     try:
-        image = Image.open(temp_path).convert("RGB")
-
-        input_axial = get_transform_for("alzheimer", "axial")(image).unsqueeze(0).to(device)
-        input_sagittal = get_transform_for("alzheimer", "sagittal")(image).unsqueeze(0).to(device)
-        input_parkinson = get_transform_for("parkinson", "drawing")(image).unsqueeze(0).to(device)
-
-        pred_ax_idx, label_ax, score_ax = predict_with_ensemble_fixed(alz_ax_50, alz_ax_101, input_axial, alz_classes)
-        pred_sag_idx, label_sag, score_sag = predict_with_ensemble_fixed(alz_sag_50, alz_sag_101, input_sagittal, alz_classes)
-        pred_park_idx, label_park, score_park = predict_with_ensemble_fixed(park_50, park_101, input_parkinson, park_classes)
-
-        all_preds = [
-            ("Alzheimer Axial", label_ax, score_ax),
-            ("Alzheimer Sagittal", label_sag, score_sag),
-            ("Parkinson", label_park, score_park)
-        ]
-        best = max(all_preds, key=lambda x: x[2])
-        best_name, best_label, best_score = best
-        if "Axial" in best_name:
-            cam_model = alz_ax_101  
-            disease = "alzheimer"
-            modality = "mri_axial"
-        elif "Sagittal" in best_name:
-            cam_model = alz_sag_101
-            disease = "alzheimer"
-            modality = "mri_sagittal"
-        elif "Parkinson" in best_name:
-            cam_model = park_101
-            disease = "parkinson"
-            modality = "mri_sagittal"
-        else:
-            raise Exception(f"Unknown best_name: {best_name}")
-
-        executor.submit(generate_cam_async, cam_model, temp_path, device, disease, modality, prediction_id)
-
-        return {
-            "prediction_id": prediction_id,
-            "predicted_disease": best_name,
-            "predicted_class": best_label,
-            "score": round(best_score * 100, 2),
-            "all_predictions": {
-                "Alzheimer Axial": (label_ax, round(score_ax * 100, 2)),
-                "Alzheimer Sagittal": (label_sag, round(score_sag * 100, 2)),
-                "Parkinson": (label_park, round(score_park * 100, 2))
-            }
-        }
+        upload = read_upload(file)
+        inputs = await inference_pool.run(prepare_ensemble_input, upload)
+        predictions = await ensemble_engine.predict(inputs, cascade_thresholds=CASCADE_THRESHOLDS)
+        return build_ensemble_response(upload.rgb, inputs, predictions, prediction_id)
 
+    except ServerBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         return {"error": str(e)}
-    finally:
-        pass  
 
 
-def generate_cam_async(model, temp_path, device, disease, modality, prediction_id):
-    gradcam_result = generate_cam_combined(model, temp_path, device, disease, modality)
-    PREDICTION_CACHE[prediction_id] = {
+def select_cam_mode():
+    if cam_jobs.queue.qsize() >= CAM_FALLBACK_QUEUE_DEPTH:
+        return "gradcam"
+    return CAM_MODE
+
+
+def get_cam_model(model_key):
+    return model_registry.get(*model_key, variant="fp32")
+
+
+def generate_cam_async(model_key, image, device, disease, modality, pred_class_idx=None, input_tensor=None):
+    mode = select_cam_mode()
+    gradcam_result = generate_cam_combined(
+        get_cam_model(model_key), image, device, disease, modality,
+        pred_class_idx=pred_class_idx,
+        mode=mode,
+        input_tensor=input_tensor
+    )
+    return {
         "gradcam_url": f"/static/{os.path.basename(gradcam_result['gradcam_path'])}",
         "activation_zone": gradcam_result["activation_zone"],
         "region_scores": gradcam_result["region_scores"],
-        "activation_score": gradcam_result["activation_score"]
+        "activation_score": gradcam_result["activation_score"],
+        "cam_mode": mode
     }
-    if os.path.exists(temp_path):
-        os.remove(temp_path)
-
-
-def generate_cam_ensemble(models, temp_path, device, disease, modality, prediction_id):
-    cam_gray_images = []
-    predicted_diseases = []
-    meta_result = None
-    for model in models:
-        cam_result = generate_cam_combined(model, temp_path, device, disease, modality)
-        cam_img = cv2.imread(cam_result["gradcam_path"])
-        cam_gray = cv2.cvtColor(cam_img, cv2.COLOR_RGB2GRAY).astype(np.float32) / 255.0
-        predicted_diseases.append(cam_result["predicted_disease"].lower())
-        cam_gray_images.append(cam_gray)
-        meta_result = cam_result
-
-    from collections import Counter
-    main_disease = Counter(predicted_diseases).most_common(1)[0][0]
-
-    if "parkinson" in main_disease:
-        mask_type = "sagittal"
-    elif "alzheimer axial" in main_disease:
-        mask_type = "axial"
-    elif "alzheimer sagittal" in main_disease:
-        mask_type = "sagittal"
-    else:
-        mask_type = "axial"
-
-    masked_images = [mask_non_brain_regions_ensemble(cam, mask_type) for cam in cam_gray_images]
-
-    combined_gray = np.mean(masked_images, axis=0)
-    combined_rgb = np.stack([combined_gray]*3, axis=-1)
-    combined_rgb = (combined_rgb * 255).astype(np.uint8)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    save_path = f"temp/cam_{timestamp}_ensemble.png"
-    cv2.imwrite(save_path, cv2.cvtColor(combined_rgb, cv2.COLOR_RGB2BGR))
-
-    PREDICTION_CACHE[prediction_id] = {
-        "gradcam_url": f"/static/{os.path.basename(save_path)}",
-        "activation_zone": meta_result["activation_zone"],
-        "region_scores": meta_result["region_scores"],
-        "activation_score": meta_result["activation_score"],
-        "main_disease": main_disease
+
+
+def generate_cam_ensemble_async(model_keys, image, device, disease, modality, pred_class_idx=None,
+                                input_tensor=None):
+    mode = select_cam_mode()
+    gradcam_result = generate_cam_ensemble(
+        [get_cam_model(key) for key in model_keys], image, device, disease, modality,
+        weights=ENSEMBLE_CAM_WEIGHTS,
+        pred_class_idx=pred_class_idx,
+        mode=mode,
+        input_tensor=input_tensor
+    )
+    return {
+        "gradcam_url": f"/static/{os.path.basename(gradcam_result['gradcam_path'])}",
+        "activation_zone": gradcam_result["activation_zone"],
+        "region_scores": gradcam_result["region_scores"],
+        "activation_score": gradcam_result["activation_score"],
+        "main_disease": gradcam_result["predicted_class"],
+        "cam_mode": mode
     }
 
-    if os.path.exists(temp_path):
-        os.remove(temp_path)
+
+@app.on_event("startup")
+def warmup_models():
+    if MODEL_WARMUP:
+        keys = None if MODEL_WARMUP == "all" else MODEL_WARMUP
+        inference_pool.executor.submit(model_registry.warmup, keys)
+
+
+@app.get("/models/stats")
+def get_model_stats():
+    return model_registry.stats()
 
 
 @app.get("/cam-status/{prediction_id}")
 def get_cam_status(prediction_id: str):
-    return PREDICTION_CACHE.get(prediction_id, {"status": "pending"})
+    return cam_jobs.status(prediction_id)
+
+
+def render_drawing_file(source, kind, path):
+    return artifact_renderer.write(path, render_drawing_artifact(source, kind))
+
+
+@app.get("/artifacts/{prediction_id}/{kind}")
+async def get_artifact(prediction_id: str, kind: str):
+    try:
+        uuid.UUID(prediction_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Unknown prediction")
+    if kind not in DRAWING_ARTIFACTS:
+        raise HTTPException(status_code=404, detail=f"Unknown artifact: {kind}")
+
+    path = os.path.join(RESULTS_DIR, f"{prediction_id}_drawing_{kind}.{ARTIFACT_FORMAT}")
+    if not os.path.exists(path):
+        source = drawing_sources.get(prediction_id)
+        if source is None:
+            raise HTTPException(status_code=404, detail="Artifact source expired")
+        try:
+            await inference_pool.run(render_drawing_file, source, kind, path)
+        except ServerBusy as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+    return FileResponse(path, media_type=f"image/{ARTIFACT_FORMAT}")
+
+
+@app.get("/cam-jobs/stats")
+def get_cam_job_stats():
+    return cam_jobs.stats()
+
+
+@app.get("/features/stats")
+def get_feature_index_stats():
+    return feature_index.stats()
+
+
+@app.get("/predict-cache/stats")
+def get_result_cache_stats():
+    return result_cache.stats()
@@ -0,0 +1,72 @@
+import os
+import time
+
+import torch
+
+from models.audio_model import AudioSpectrogramClassifier
+
+EXPORTED_DIR = "models/exported"
+
+
+def exported_path_for(model_path):
+    base = os.path.splitext(os.path.basename(model_path))[0]
+    return os.path.join(EXPORTED_DIR, f"{base}_ts.pt")
+
+
+def example_inputs_for(model_class):
+    if model_class == AudioSpectrogramClassifier:
+        return torch.randn(1, 160000), torch.randn(1, 128, 313)
+    if model_class == "resnet50_raw":
+        return (torch.randn(1, 3, 224, 224),)
+    return (torch.randn(1, 3, 256, 256),)
+
+
+def export_model(model, example_inputs, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with torch.inference_mode():
+        scripted = torch.jit.trace(model.eval(), example_inputs)
+        frozen = torch.jit.freeze(scripted)
+        optimized = torch.jit.optimize_for_inference(frozen)
+    torch.jit.save(optimized, path)
+    return optimized
+
+
+def load_exported(path, device="cpu"):
+    model = torch.jit.load(path, map_location=device)
+    return model.eval()
+
+
+def measure_latency_ms(model, example_inputs, runs=10):
+    with torch.inference_mode():
+        model(*example_inputs)
+        start = time.perf_counter()
+        for _ in range(runs):
+            model(*example_inputs)
+    return (time.perf_counter() - start) / runs * 1000
+
+
+if __name__ == "__main__":
+    from models.model_loader import MODEL_MAP, load_model_for
+
+    exported = set()
+    for (disease, modality), (model_path, model_class, _) in MODEL_MAP.items():
+        if model_path in exported:
+            continue
+        exported.add(model_path)
+
+        start = time.perf_counter()
+        model = load_model_for(disease, modality, "cpu")
+        eager_load_s = time.perf_counter() - start
+
+        example_inputs = example_inputs_for(model_class)
+        path = exported_path_for(model_path)
+        export_model(model, example_inputs, path)
+
+        start = time.perf_counter()
+        optimized = load_exported(path)
+        exported_load_s = time.perf_counter() - start
+
+        print(f"{disease}/{modality} -> {path}: "
+              f"load {eager_load_s:.2f} s -> {exported_load_s:.2f} s, "
+              f"latency {measure_latency_ms(model, example_inputs):.1f} ms -> "
+              f"{measure_latency_ms(optimized, example_inputs):.1f} ms")
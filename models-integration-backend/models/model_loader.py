@@ -1,26 +1,57 @@
+import os
+
 import torch
 from torchvision import models
 from models.audio_model import AudioSpectrogramClassifier
 from models.model_defs import ResNetModel, ResNet101_MRI
+from models.export import exported_path_for, load_exported
+from models.quantization import quantized_path_for, load_quantized
 
-def load_model_for(disease: str, modality: str, device="cpu"):
-    model_map = {
-        ("alzheimer", "mri_axial"): ("models/ResNet101_Alzheimer_Axial_Multiclass.pth", ResNet101_MRI, 5),
-        ("alzheimer", "mri_sagittal"): ("models/ResNet101_Alzheimer_Sagittal_Multiclass.pth", ResNet101_MRI, 5),
-        ("alzheimer", "general"): ("models/ResNet_Alzheimer_Multiclass.pth", ResNetModel, 5),
-        ("alzheimer", "audio"): ("models/dual_branch_model.pth", AudioSpectrogramClassifier, 3),
+MODEL_MAP = {
+    ("alzheimer", "mri_axial"): ("models/ResNet101_Alzheimer_Axial_Multiclass.pth", ResNet101_MRI, 5),
+    ("alzheimer", "mri_axial_r50"): ("models/ResNet_Alzheimer_Axial_Multiclass.pth", ResNetModel, 5),
+    ("alzheimer", "mri_sagittal"): ("models/ResNet101_Alzheimer_Sagittal_Multiclass.pth", ResNet101_MRI, 5),
+    ("alzheimer", "mri_sagittal_r50"): ("models/ResNet_Alzheimer_Sagittal_Multiclass.pth", ResNetModel, 5),
+    ("alzheimer", "general"): ("models/ResNet_Alzheimer_Multiclass.pth", ResNetModel, 5),
+    ("alzheimer", "audio"): ("models/dual_branch_model.pth", AudioSpectrogramClassifier, 3),
 
-        ("parkinson", "general"): ("models/ResNet_Parkinson_Multiclass.pth", ResNetModel, 4),
-        ("parkinson", "mri"): ("models/ResNet101_Parkinson_Multiclass.pth", ResNet101_MRI, 4),
-        ("parkinson", "audio"): ("models/dual_branch_model.pth", AudioSpectrogramClassifier, 3),
-        ("parkinson", "drawing"): ("models/resnet50_parkinson.pth", "resnet50_raw", 2),
-    }
+    ("parkinson", "general"): ("models/ResNet_Parkinson_Multiclass.pth", ResNetModel, 4),
+    ("parkinson", "mri"): ("models/ResNet101_Parkinson_Multiclass.pth", ResNet101_MRI, 4),
+    ("parkinson", "audio"): ("models/dual_branch_model.pth", AudioSpectrogramClassifier, 3),
+    ("parkinson", "drawing"): ("models/resnet50_parkinson.pth", "resnet50_raw", 2),
+}
 
+def get_model_spec(disease: str, modality: str):
     key = (disease, modality)
-    if key not in model_map:
+    if key not in MODEL_MAP:
         raise ValueError(f"Model not found for {disease} + {modality}")
+    return MODEL_MAP[key]
+
+def artifact_path_for(model_path, variant="fp32"):
+    if variant == "int8":
+        return quantized_path_for(model_path)
+    if variant == "torchscript":
+        return exported_path_for(model_path)
+    return model_path
+
+def load_model_for(disease: str, modality: str, device="cpu", variant="fp32"):
+    model_path, model_class, num_classes = get_model_spec(disease, modality)
+
+    if variant == "int8":
+        quantized_path = artifact_path_for(model_path, variant)
+        if torch.device(device).type != "cpu":
+            raise ValueError(f"INT8 models run on CPU only, got device {device}")
+        if not os.path.exists(quantized_path):
+            raise FileNotFoundError(
+                f"Quantized model {quantized_path} missing, run evaluation/quantize_models.py first"
+            )
+        return load_quantized(quantized_path)
 
-    model_path, model_class, num_classes = model_map[key]
+    if variant == "torchscript":
+        exported_path = artifact_path_for(model_path, variant)
+        if not os.path.exists(exported_path):
+            raise FileNotFoundError(f"Exported model {exported_path} missing, run python -m models.export first")
+        return load_exported(exported_path, device)
 
     if model_class == AudioSpectrogramClassifier:
         model = model_class(n_classes=num_classes, pretrained_resnet=False)
@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import torch
+
+from models.model_loader import MODEL_MAP, artifact_path_for, get_model_spec, load_model_for
+
+
+def model_memory_bytes(model, artifact_path=None):
+    if isinstance(model, torch.jit.ScriptModule) and artifact_path and os.path.exists(artifact_path):
+        return os.path.getsize(artifact_path)
+    tensors = [value for value in model.state_dict().values() if isinstance(value, torch.Tensor)]
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+class ModelRegistry:
+    def __init__(self, device, memory_budget_mb=None, variants=None, default_variant="fp32", on_evict=None):
+        self.device = device
+        self.on_evict = on_evict
+        self.variants = variants or {}
+        self.default_variant = default_variant
+        self.memory_budget = memory_budget_mb * 2 ** 20 if memory_budget_mb else None
+        self.models = OrderedDict()
+        self.memory = {}
+        self.loading = {}
+        self.lock = threading.Lock()
+        self.metrics = {"hits": 0, "misses": 0, "evictions": 0, "load_time_s": {}}
+
+    def variant_for(self, disease, modality):
+        return self.variants.get((disease, modality), self.default_variant)
+
+    def version_for(self, disease, modality, variant=None):
+        variant = variant or self.variant_for(disease, modality)
+        path = get_model_spec(disease, modality)[0]
+        mtime = int(os.path.getmtime(path)) if os.path.exists(path) else 0
+        return f"{os.path.basename(path)}@{mtime}:{variant}"
+
+    def get(self, disease, modality, variant=None):
+        variant = variant or self.variant_for(disease, modality)
+        checkpoint = (get_model_spec(disease, modality)[0], variant)
+
+        with self.lock:
+            model = self.models.get(checkpoint)
+            if model is not None:
+                self.models.move_to_end(checkpoint)
+                self.metrics["hits"] += 1
+                return model
+
+            self.metrics["misses"] += 1
+            event = self.loading.get(checkpoint)
+            owner = event is None
+            if owner:
+                event = threading.Event()
+                self.loading[checkpoint] = event
+
+        if not owner:
+            event.wait()
+            with self.lock:
+                model = self.models.get(checkpoint)
+            if model is not None:
+                return model
+            return self.get(disease, modality, variant)
+
+        try:
+            start = time.perf_counter()
+            model = load_model_for(disease, modality, self.device, variant)
+            load_time = time.perf_counter() - start
+            with self.lock:
+                self.models[checkpoint] = model
+                self.memory[checkpoint] = model_memory_bytes(model, artifact_path_for(*checkpoint))
+                self.metrics["load_time_s"][checkpoint] = round(load_time, 3)
+                evicted = self._evict(keep=checkpoint)
+        finally:
+            with self.lock:
+                del self.loading[checkpoint]
+            event.set()
+
+        if self.on_evict:
+            for evicted_model in evicted:
+                self.on_evict(evicted_model)
+        return model
+
+    def track_copy(self, model, copied):
+        with self.lock:
+            checkpoint = next((c for c, m in self.models.items() if m is model), None)
+            if checkpoint is None:
+                return
+            self.memory[checkpoint] += model_memory_bytes(copied)
+            evicted = self._evict(keep=checkpoint)
+
+        if self.on_evict:
+            for evicted_model in evicted:
+                self.on_evict(evicted_model)
+
+    def _evict(self, keep):
+        evicted = []
+        if self.memory_budget is None:
+            return evicted
+        while sum(self.memory.values()) > self.memory_budget and len(self.models) > 1:
+            checkpoint = next(iter(self.models))
+            if checkpoint == keep:
+                break
+            evicted.append(self.models.pop(checkpoint))
+            del self.memory[checkpoint]
+            self.metrics["evictions"] += 1
+        return evicted
+
+    def release(self, disease, modality, variant=None):
+        variant = variant or self.variant_for(disease, modality)
+        checkpoint = (get_model_spec(disease, modality)[0], variant)
+        with self.lock:
+            model = self.models.pop(checkpoint, None)
+            self.memory.pop(checkpoint, None)
+        if model is not None and self.on_evict:
+            self.on_evict(model)
+
+    def warmup(self, keys=None):
+        for disease, modality in keys or MODEL_MAP:
+            self.get(disease, modality)
+
+    def stats(self):
+        with self.lock:
+            loaded = {
+                f"{path} [{variant}]": {
+                    "memory_mb": round(self.memory[(path, variant)] / 2 ** 20, 1),
+                    "load_time_s": self.metrics["load_time_s"].get((path, variant))
+                }
+                for path, variant in self.models
+            }
+            requests = self.metrics["hits"] + self.metrics["misses"]
+            return {
+                "loaded_models": loaded,
+                "total_memory_mb": round(sum(self.memory.values()) / 2 ** 20, 1),
+                "memory_budget_mb": round(self.memory_budget / 2 ** 20, 1) if self.memory_budget else None,
+                "hits": self.metrics["hits"],
+                "misses": self.metrics["misses"],
+                "hit_rate": round(self.metrics["hits"] / requests, 4) if requests else None,
+                "evictions": self.metrics["evictions"],
+                "registered_keys": len(MODEL_MAP),
+                "unique_checkpoints": len({spec[0] for spec in MODEL_MAP.values()})
+            }
@@ -0,0 +1,43 @@
+import copy
+import os
+
+import torch
+from torch.ao.quantization import get_default_qconfig_mapping
+from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
+
+QUANTIZED_DIR = "models/quantized"
+QUANTIZATION_BACKEND = "fbgemm"
+
+
+def quantized_path_for(model_path):
+    base = os.path.splitext(os.path.basename(model_path))[0]
+    return os.path.join(QUANTIZED_DIR, f"{base}_int8.pt")
+
+
+def quantize_static(model, calibration_loader, num_batches=10, backend=QUANTIZATION_BACKEND):
+    torch.backends.quantized.engine = backend
+    model = copy.deepcopy(model).cpu().eval()
+
+    example_inputs = (next(iter(calibration_loader))[0][:1],)
+    prepared = prepare_fx(model, get_default_qconfig_mapping(backend), example_inputs)
+
+    with torch.inference_mode():
+        for i, (images, _) in enumerate(calibration_loader):
+            if i >= num_batches:
+                break
+            prepared(images)
+
+    return convert_fx(prepared)
+
+
+def save_quantized(model, example_input, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with torch.inference_mode():
+        scripted = torch.jit.trace(model, example_input)
+    torch.jit.save(scripted, path)
+
+
+def load_quantized(path, backend=QUANTIZATION_BACKEND):
+    torch.backends.quantized.engine = backend
+    model = torch.jit.load(path, map_location="cpu")
+    return model.eval()
@@ -1,26 +1,43 @@
+from functools import lru_cache
+
+import torch
 from torchvision import transforms
 
-def get_transform_for(disease: str, modality: str):
+base_transform = transforms.Compose([
+    transforms.Grayscale(num_output_channels=3),
+    transforms.Resize((256, 256)),
+    transforms.ToTensor()
+])
+
+def get_normalization_for(disease: str, modality: str):
     if disease == "alzheimer":
         if modality == "mri_axial":
-            mean = [0.2006] * 3
-            std = [0.2396] * 3
+            return 0.2006, 0.2396
         elif modality == "mri_sagittal":
-            mean = [0.2487] * 3
-            std = [0.2599] * 3
+            return 0.2487, 0.2599
         else:
-            mean = [0.2006] * 3
-            std = [0.2396] * 3
+            return 0.2006, 0.2396
     elif disease == "parkinson":
-        mean = [0.2514] * 3
-        std = [0.2475] * 3
+        return 0.2514, 0.2475
     else:
-        mean = [0.5] * 3
-        std = [0.5] * 3
+        return 0.5, 0.5
+
+@lru_cache(maxsize=None)
+def get_transform_for(disease: str, modality: str):
+    mean, std = get_normalization_for(disease, modality)
 
     return transforms.Compose([
-        transforms.Grayscale(num_output_channels=3),
-        transforms.Resize((256, 256)),
-        transforms.ToTensor(),
-        transforms.Normalize(mean, std)
+        base_transform,
+        transforms.Normalize([mean] * 3, [std] * 3)
     ])
+
+@lru_cache(maxsize=None)
+def _normalization_stack(keys):
+    stats = torch.tensor([get_normalization_for(disease, modality) for disease, modality in keys])
+    return stats[:, 0].view(-1, 1, 1, 1), stats[:, 1].view(-1, 1, 1, 1)
+
+def preprocess_shared(image, keys):
+    keys = tuple(keys)
+    mean, std = _normalization_stack(keys)
+    tensor = base_transform(image)
+    return (tensor.unsqueeze(0) - mean) / std
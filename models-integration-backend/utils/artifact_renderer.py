@@ -0,0 +1,85 @@
+import os
+import uuid
+from functools import lru_cache
+
+import cv2
+import numpy as np
+
+from constants.constants import ARTIFACT_FORMAT
+
+COLORMAPS = {
+    "jet": cv2.COLORMAP_JET,
+    "magma": cv2.COLORMAP_MAGMA,
+    "viridis": cv2.COLORMAP_VIRIDIS,
+    "inferno": cv2.COLORMAP_INFERNO
+}
+
+ENCODE_PARAMS = {
+    "png": [cv2.IMWRITE_PNG_COMPRESSION, 1],
+    "webp": [cv2.IMWRITE_WEBP_QUALITY, 90]
+}
+
+
+@lru_cache(maxsize=None)
+def colormap_lut(name):
+    ramp = np.arange(256, dtype=np.uint8).reshape(256, 1)
+    return cv2.applyColorMap(ramp, COLORMAPS[name]).reshape(1, 256, 3)
+
+
+def to_uint8(array, vmin=None, vmax=None):
+    array = np.asarray(array, dtype=np.float32)
+    vmin = float(array.min()) if vmin is None else vmin
+    vmax = float(array.max()) if vmax is None else vmax
+    scaled = (array - vmin) * (255.0 / max(vmax - vmin, 1e-8))
+    return np.clip(scaled, 0, 255).astype(np.uint8)
+
+
+def colorize(array, cmap="viridis", vmin=None, vmax=None, size=None, origin_lower=False):
+    indices = to_uint8(array, vmin, vmax)
+    if origin_lower:
+        indices = indices[::-1]
+    if size is not None:
+        indices = cv2.resize(indices, size, interpolation=cv2.INTER_NEAREST)
+    return cv2.LUT(cv2.merge([indices, indices, indices]), colormap_lut(cmap))
+
+
+def overlay(background, heatmap, alpha=0.3):
+    if background.ndim == 2:
+        background = cv2.cvtColor(background, cv2.COLOR_GRAY2BGR)
+    return cv2.addWeighted(background, 1 - alpha, heatmap, alpha, 0)
+
+
+def line_plot(values, size=(600, 400), margin=30, color=(180, 119, 31)):
+    width, height = size
+    canvas = np.full((height, width, 3), 255, dtype=np.uint8)
+    values = np.asarray(values, dtype=np.float32)
+
+    for i in range(1, 5):
+        x = margin + i * (width - 2 * margin) // 5
+        y = margin + i * (height - 2 * margin) // 5
+        cv2.line(canvas, (x, margin), (x, height - margin), (230, 230, 230), 1)
+        cv2.line(canvas, (margin, y), (width - margin, y), (230, 230, 230), 1)
+    cv2.rectangle(canvas, (margin, margin), (width - margin, height - margin), (0, 0, 0), 1)
+
+    if len(values) > 1:
+        xs = np.linspace(margin, width - margin, len(values))
+        ys = (height - margin) - to_uint8(values).astype(np.float32) / 255.0 * (height - 2 * margin)
+        points = np.round(np.stack([xs, ys], axis=1)).astype(np.int32)
+        cv2.polylines(canvas, [points], False, color, 2, cv2.LINE_AA)
+    return canvas
+
+
+def encode(image, fmt=ARTIFACT_FORMAT):
+    ok, buffer = cv2.imencode(f".{fmt}", image, ENCODE_PARAMS.get(fmt, []))
+    if not ok:
+        raise ValueError(f"Could not encode artifact as {fmt}")
+    return buffer.tobytes()
+
+
+def write(path, image):
+    fmt = path.rsplit(".", 1)[-1]
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(encode(image, fmt))
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,27 @@
+import threading
+from collections import OrderedDict
+
+
+class ArtifactSources:
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self.sources = OrderedDict()
+        self.lock = threading.Lock()
+
+    def put(self, key, source):
+        with self.lock:
+            self.sources[key] = source
+            self.sources.move_to_end(key)
+            while len(self.sources) > self.max_entries:
+                self.sources.popitem(last=False)
+
+    def get(self, key):
+        with self.lock:
+            source = self.sources.get(key)
+            if source is not None:
+                self.sources.move_to_end(key)
+            return source
+
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self.sources), "max_entries": self.max_entries}
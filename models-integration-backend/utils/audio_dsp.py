@@ -0,0 +1,40 @@
+import librosa
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def fit_segment(y, segment_len=160000):
+    if len(y) < segment_len:
+        return np.pad(y, (0, segment_len - len(y)))
+    return y[:segment_len]
+
+
+def frame_energy(y, frame_length=2048, hop_length=512):
+    n_frames = len(range(0, len(y) - frame_length, hop_length))
+    if n_frames <= 0:
+        return np.empty(0, dtype=np.float32)
+    return sliding_window_view(np.square(y), frame_length)[::hop_length][:n_frames].sum(axis=1)
+
+
+def has_voice(y, sr, threshold_energy=0.01, min_voiced_ratio=0.1):
+    energy = frame_energy(y)
+    if len(energy) == 0:
+        return False
+    return np.sum(energy > threshold_energy) / len(energy) > min_voiced_ratio
+
+
+def compute_mel(y, sr):
+    mel = librosa.feature.melspectrogram(y=y, sr=sr, n_mels=128)
+    mel_db = librosa.power_to_db(mel, ref=np.max)
+    mel_db = (mel_db - np.mean(mel_db)) / np.std(mel_db)
+    return mel, mel_db
+
+
+def pad_or_crop(mel, n_frames=128):
+    if mel.shape[1] >= n_frames:
+        return mel[:, :n_frames]
+    return np.pad(mel, ((0, 0), (0, n_frames - mel.shape[1])), mode='constant')
+
+
+def mel_features(y, sr, n_frames=128):
+    return pad_or_crop(compute_mel(y, sr)[1], n_frames)
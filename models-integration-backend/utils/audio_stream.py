@@ -0,0 +1,134 @@
+import itertools
+import os
+import shutil
+import tempfile
+
+import audioread
+import librosa
+import numpy as np
+import soundfile as sf
+import torch
+
+from utils.audio_dsp import compute_mel, fit_segment, has_voice
+
+
+def _mono(block):
+    return block.mean(axis=1) if block.ndim > 1 else block
+
+
+def _resampled(blocks, source_sr, sr):
+    for block in blocks:
+        if source_sr != sr:
+            block = librosa.resample(block, orig_sr=source_sr, target_sr=sr)
+        yield block
+
+
+def _segments(read_blocks, source_sr, sr, segment_len, max_segments=None):
+    block_len = int(round(segment_len * source_sr / sr))
+
+    def blocks():
+        return _resampled(itertools.islice(read_blocks(block_len), max_segments), source_sr, sr)
+
+    peak = max((float(np.max(np.abs(block))) for block in blocks()), default=0.0)
+    for segment in blocks():
+        yield segment, peak
+
+
+def _streamed_segments(stream, sr, segment_len, max_segments=None):
+    with sf.SoundFile(stream) as f:
+        def read_blocks(block_len):
+            f.seek(0)
+            for block in f.blocks(blocksize=block_len, dtype="float32", always_2d=True):
+                yield _mono(block)
+
+        yield from _segments(read_blocks, f.samplerate, sr, segment_len, max_segments)
+
+
+def _audioread_blocks(path, block_len):
+    with audioread.audio_open(path) as f:
+        pending, pending_len = [], 0
+        for buf in f:
+            frames = _mono(librosa.util.buf_to_float(buf, dtype=np.float32).reshape(-1, f.channels))
+            pending.append(frames)
+            pending_len += len(frames)
+            if pending_len >= block_len:
+                merged = np.concatenate(pending)
+                while len(merged) >= block_len:
+                    yield merged[:block_len]
+                    merged = merged[block_len:]
+                pending, pending_len = [merged], len(merged)
+        if pending_len:
+            yield np.concatenate(pending)
+
+
+def _decoded_segments(stream, sr, segment_len, max_segments=None):
+    with tempfile.NamedTemporaryFile(delete=False) as tmp:
+        shutil.copyfileobj(stream, tmp)
+    try:
+        with audioread.audio_open(tmp.name) as f:
+            source_sr = f.samplerate
+        yield from _segments(
+            lambda block_len: _audioread_blocks(tmp.name, block_len), source_sr, sr, segment_len, max_segments
+        )
+    finally:
+        os.remove(tmp.name)
+
+
+def iter_segments(stream, sr=16000, segment_len=160000, max_segments=None):
+    try:
+        sf.info(stream)
+        stream.seek(0)
+        segments = _streamed_segments(stream, sr, segment_len, max_segments)
+    except RuntimeError:
+        stream.seek(0)
+        segments = _decoded_segments(stream, sr, segment_len, max_segments)
+
+    for index, (segment, peak) in enumerate(segments):
+        if len(segment) == 0:
+            continue
+        yield index, fit_segment(segment / max(peak, 1e-8), segment_len).astype(np.float32)
+
+
+def _score(model, segments, sr, device):
+    audio = torch.from_numpy(np.stack(segments)).to(device)
+    mels = torch.from_numpy(np.stack([compute_mel(y, sr)[1] for y in segments]).astype(np.float32)).to(device)
+    with torch.inference_mode():
+        return torch.softmax(model(audio, mels), dim=1).cpu().numpy()
+
+
+def classify_recording(model, stream, device, sr=16000, segment_len=160000, batch_size=16, max_segments=None):
+    probabilities, voiced_indices, batch, batch_indices = [], [], [], []
+    first_segment, first_voiced = None, None
+    total = 0
+
+    for index, segment in iter_segments(stream, sr, segment_len, max_segments):
+        total += 1
+        if first_segment is None:
+            first_segment = segment
+        if not has_voice(segment, sr):
+            continue
+
+        if first_voiced is None:
+            first_voiced = segment
+        batch.append(segment)
+        batch_indices.append(index)
+        if len(batch) == batch_size:
+            probabilities.append(_score(model, batch, sr, device))
+            voiced_indices.extend(batch_indices)
+            batch, batch_indices = [], []
+
+    if batch:
+        probabilities.append(_score(model, batch, sr, device))
+        voiced_indices.extend(batch_indices)
+
+    if not voiced_indices and first_segment is not None:
+        probabilities.append(_score(model, [first_segment], sr, device))
+
+    segment_probabilities = np.concatenate(probabilities) if probabilities else np.empty((0, 0))
+    return {
+        "probabilities": segment_probabilities.mean(axis=0) if len(segment_probabilities) else None,
+        "segment_probabilities": segment_probabilities,
+        "voiced_indices": voiced_indices,
+        "total_segments": total,
+        "display_segment": first_voiced if first_voiced is not None else first_segment
+    }
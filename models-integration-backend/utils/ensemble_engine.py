@@ -0,0 +1,70 @@
+import asyncio
+
+import torch
+
+from evaluation.ensemble_utils import combine_ensemble_logits, cascade_prediction
+from utils.batching import MicroBatcher
+
+
+class EnsembleEngine:
+    def __init__(self, members, registry, device, executor, max_batch_size=8, max_wait_ms=10, max_queue_size=0):
+        self.members = members
+        self.registry = registry
+        self.device = device
+        self.batchers = {}
+
+        for name in members:
+            for branch in ("r50", "r101"):
+                self.batchers[(name, branch)] = MicroBatcher(
+                    self._run_member,
+                    max_batch_size=max_batch_size,
+                    max_wait_ms=max_wait_ms,
+                    max_queue_size=max_queue_size,
+                    executor=executor
+                )
+
+    def _run_member(self, key, input_tensors):
+        name, branch = key
+        key_r50, key_r101, _ = self.members[name]
+        model = self.registry.get(*(key_r50 if branch == "r50" else key_r101))
+        batch = torch.stack(input_tensors).to(self.device)
+
+        with torch.no_grad(), torch.amp.autocast(device_type=self.device.type, enabled=self.device.type == 'cuda'):
+            logits = model(batch).float().cpu()
+        return list(logits)
+
+    async def _member_logits(self, inputs, names, branch):
+        keys = [(name, branch) for name in names]
+        outputs = await asyncio.gather(*(self.batchers[key].submit(key, inputs[key[0]]) for key in keys))
+        return {name: output.unsqueeze(0) for name, output in zip(names, outputs)}
+
+    async def predict(self, inputs, w_r50=0.5, w_r101=0.5, cascade_thresholds=None):
+        if not cascade_thresholds:
+            out_r50, out_r101 = await asyncio.gather(
+                self._member_logits(inputs, list(inputs), "r50"),
+                self._member_logits(inputs, list(inputs), "r101")
+            )
+        else:
+            out_r50 = await self._member_logits(inputs, list(inputs), "r50")
+
+        results = {}
+        for name in inputs:
+            if cascade_thresholds and name in cascade_thresholds:
+                result = cascade_prediction(out_r50[name], self.members[name][2], cascade_thresholds[name])
+                if result is not None:
+                    results[name] = result
+
+        if cascade_thresholds:
+            escalated = [name for name in inputs if name not in results]
+            out_r101 = await self._member_logits(inputs, escalated, "r101")
+
+        for name in inputs:
+            if name not in results:
+                results[name] = combine_ensemble_logits(
+                    out_r50[name],
+                    out_r101[name],
+                    self.members[name][2],
+                    w_r50,
+                    w_r101
+                )
+        return results
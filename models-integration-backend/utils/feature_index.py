@@ -0,0 +1,122 @@
+import io
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def pack_record(record):
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **record)
+    return buffer.getvalue()
+
+
+def unpack_record(blob):
+    with np.load(io.BytesIO(blob)) as data:
+        return {name: data[name] for name in data.files}
+
+
+class FeatureStore:
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS features (key TEXT PRIMARY KEY, record BLOB NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS features_created_at ON features (created_at)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def save(self, key, record):
+        record = {**record, "mel": np.asarray(record["mel"]).astype(np.float16)}
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO features (key, record, created_at) VALUES (?, ?, ?)",
+                (key, pack_record(record), time.time())
+            )
+
+    def load(self, key):
+        with self._connect() as conn:
+            row = conn.execute("SELECT record FROM features WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        record = unpack_record(row[0])
+        record["mel"] = record["mel"].astype(np.float32)
+        return record
+
+    def evict(self, max_stored):
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM features WHERE key IN "
+                "(SELECT key FROM features ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (max_stored,)
+            )
+
+    def count(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM features").fetchone()[0]
+
+
+class FeatureIndex:
+    def __init__(self, path=None, max_entries=256, packed_store=None, max_stored=None):
+        self.max_entries = max_entries
+        self.max_stored = max_stored
+        self.last_eviction = time.time()
+        self.packed_store = packed_store
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.store = FeatureStore(path) if path else None
+        self.metrics = {"hits": 0, "packed_hits": 0, "disk_hits": 0, "misses": 0}
+
+    def get(self, key):
+        with self.lock:
+            record = self.entries.get(key)
+            if record is not None:
+                self.entries.move_to_end(key)
+                self.metrics["hits"] += 1
+                return record
+
+        record = self.packed_store.feature_record(key) if self.packed_store else None
+        tier = "packed_hits"
+        if record is None and self.store:
+            record = self.store.load(key)
+            tier = "disk_hits"
+        with self.lock:
+            if record is None:
+                self.metrics["misses"] += 1
+                return None
+            self.metrics["hits"] += 1
+            self.metrics[tier] += 1
+        self._remember(key, record)
+        return record
+
+    def put(self, key, record):
+        self._remember(key, record)
+        if self.store:
+            self.store.save(key, record)
+            self._evict_stored(time.time())
+
+    def _remember(self, key, record):
+        with self.lock:
+            self.entries[key] = record
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def _evict_stored(self, now):
+        if self.max_stored is None or now - self.last_eviction < 60:
+            return
+        self.last_eviction = now
+        self.store.evict(self.max_stored)
+
+    def stats(self):
+        with self.lock:
+            stats = {"entries": len(self.entries), "max_entries": self.max_entries, **self.metrics}
+        stats["stored"] = self.store.count() if self.store else None
+        stats["max_stored"] = self.max_stored
+        stats["packed"] = len(self.packed_store) if self.packed_store else None
+        return stats
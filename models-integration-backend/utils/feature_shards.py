@@ -0,0 +1,186 @@
+import glob
+import json
+import os
+
+import numpy as np
+import soundfile as sf
+import torch
+
+from constants.constants import audio_classes
+from utils.audio_dsp import compute_mel, fit_segment, pad_or_crop
+from utils.audio_utils import compute_contours, feature_key, feature_record, fit_frames
+
+INDEX_NAME = "index.json"
+FORMAT_VERSION = 2
+MEL_SHAPE = (128, 128)
+SIDE_LEN = 128
+SEGMENT_LEN = 160000
+SAMPLE_RATE = 16000
+DISPLAY_MEL_SHAPE = (128, 1 + SEGMENT_LEN // 512)
+ARRAYS = ("mel", "display_mel", "wave", "pitch", "energy")
+
+
+def normalize_wave(pcm):
+    y = pcm.astype(np.float32) / 32768.0
+    return y / max(float(np.max(np.abs(y))), 1e-8)
+
+
+class PackedFeatureWriter:
+    def __init__(self, root, shard_size=256):
+        self.root = root
+        self.shard_size = shard_size
+        self.entries = []
+        self.shards = []
+        self.buffer = {name: [] for name in ARRAYS}
+        os.makedirs(root, exist_ok=True)
+
+    def add(self, name, mel, display_mel, pcm, pitch, energy, split=None, label=None, content_key=None):
+        self.buffer["mel"].append(pad_or_crop(mel, MEL_SHAPE[1]).astype(np.float16))
+        self.buffer["display_mel"].append(pad_or_crop(display_mel, DISPLAY_MEL_SHAPE[1]).astype(np.float16))
+        self.buffer["wave"].append(fit_segment(pcm, SEGMENT_LEN).astype(np.int16))
+        self.buffer["pitch"].append(fit_frames(np.asarray(pitch, dtype=np.float32), SIDE_LEN))
+        self.buffer["energy"].append(fit_frames(np.asarray(energy, dtype=np.float32), SIDE_LEN))
+        self.entries.append({
+            "name": name,
+            "split": split,
+            "label": label,
+            "content_key": content_key,
+            "shard": len(self.shards),
+            "row": len(self.buffer["mel"]) - 1
+        })
+        if len(self.buffer["mel"]) == self.shard_size:
+            self._flush()
+
+    def _flush(self):
+        if not self.buffer["mel"]:
+            return
+        shard = f"shard_{len(self.shards):05d}"
+        for name in ARRAYS:
+            np.save(os.path.join(self.root, f"{shard}.{name}.npy"), np.stack(self.buffer[name]))
+        self.shards.append({"name": shard, "count": len(self.buffer["mel"])})
+        self.buffer = {name: [] for name in ARRAYS}
+
+    def close(self):
+        self._flush()
+        index = {
+            "version": FORMAT_VERSION,
+            "mel_shape": list(MEL_SHAPE),
+            "display_mel_shape": list(DISPLAY_MEL_SHAPE),
+            "segment_len": SEGMENT_LEN,
+            "side_len": SIDE_LEN,
+            "sample_rate": SAMPLE_RATE,
+            "shards": self.shards,
+            "entries": self.entries
+        }
+        tmp_path = os.path.join(self.root, INDEX_NAME + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, os.path.join(self.root, INDEX_NAME))
+
+
+class PackedFeatureStore:
+    def __init__(self, root):
+        self.root = root
+        with open(os.path.join(root, INDEX_NAME), encoding="utf-8") as f:
+            index = json.load(f)
+        if index["version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported feature store version {index['version']} in {root}")
+        self.shards = index["shards"]
+        self.entries = index["entries"]
+        self.by_name = {entry["name"]: i for i, entry in enumerate(self.entries)}
+        self.by_content = {entry["content_key"]: i for i, entry in enumerate(self.entries) if entry["content_key"]}
+        self.arrays = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _array(self, shard, name):
+        key = (shard, name)
+        if key not in self.arrays:
+            path = os.path.join(self.root, f"{self.shards[shard]['name']}.{name}.npy")
+            self.arrays[key] = np.load(path, mmap_mode="r")
+        return self.arrays[key]
+
+    def row(self, i):
+        entry = self.entries[i]
+        return {name: self._array(entry["shard"], name)[entry["row"]] for name in ARRAYS}
+
+    def get(self, name):
+        i = self.by_name.get(name)
+        return self.row(i) if i is not None else None
+
+    def feature_record(self, content_key):
+        i = self.by_content.get(content_key)
+        if i is None:
+            return None
+        row = self.row(i)
+        return feature_record(
+            row["display_mel"].astype(np.float32), np.asarray(row["energy"]), np.asarray(row["pitch"]),
+            SAMPLE_RATE, DISPLAY_MEL_SHAPE[1]
+        )
+
+
+class PackedMelDataset:
+    def __init__(self, root, split=None, classes=None):
+        self.store = PackedFeatureStore(root)
+        self.classes = list(classes or audio_classes)
+        self.indices = [
+            i for i, entry in enumerate(self.store.entries)
+            if (split is None or entry["split"] == split) and entry["label"] in self.classes
+        ]
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, idx):
+        i = self.indices[idx]
+        row = self.store.row(i)
+        label = self.store.entries[i]["label"]
+        return (
+            torch.from_numpy(normalize_wave(row["wave"])),
+            torch.from_numpy(row["mel"].astype(np.float32)),
+            torch.tensor(self.classes.index(label), dtype=torch.long)
+        )
+
+
+def convert_per_file_layout(wav_root, mel_root, output_root, splits=("train", "test"), shard_size=256):
+    writer = PackedFeatureWriter(output_root, shard_size)
+    converted, skipped = 0, 0
+    for split in splits:
+        for wav_path in sorted(glob.glob(os.path.join(wav_root, split, "*", "*.wav"))):
+            cls = os.path.basename(os.path.dirname(wav_path))
+            base = os.path.splitext(os.path.basename(wav_path))[0]
+            mel_base = os.path.join(mel_root, split, cls, base)
+
+            pcm, sr = sf.read(wav_path, dtype="int16")
+            if pcm.ndim > 1 or sr != SAMPLE_RATE:
+                skipped += 1
+                continue
+            y = fit_segment(normalize_wave(pcm), SEGMENT_LEN)
+            mel_power, mel_db = compute_mel(y, SAMPLE_RATE)
+
+            if os.path.exists(mel_base + ".npy"):
+                mel = np.load(mel_base + ".npy")
+            elif os.path.exists(mel_base + ".npz"):
+                with np.load(mel_base + ".npz") as data:
+                    mel = data["mel"]
+            else:
+                mel = mel_db
+            energy, pitch = compute_contours(y, SAMPLE_RATE, mel_power)
+
+            writer.add(
+                f"{split}/{cls}/{base}", mel, mel_db, pcm, pitch, energy,
+                split=split, label=cls, content_key=feature_key(y, SAMPLE_RATE)
+            )
+            converted += 1
+    writer.close()
+    return converted, skipped
+
+
+if __name__ == "__main__":
+    converted, skipped = convert_per_file_layout(
+        wav_root="D:/Licenta/Datasets/Audio/data/Split_Wav",
+        mel_root="D:/Licenta/Datasets/Audio/data/MelSpectrograms",
+        output_root="D:/Licenta/Datasets/Audio/data/PackedFeatures"
+    )
+    print(f"Packed {converted} clips, skipped {skipped}")
@@ -0,0 +1,40 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+
+
+class ServerBusy(Exception):
+    pass
+
+
+class InferencePool:
+    def __init__(self, max_workers=2, max_pending=32, torch_threads=None):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+
+        if torch_threads is None:
+            torch_threads = max(1, (os.cpu_count() or 1) // max_workers)
+        torch.set_num_threads(torch_threads)
+
+    def acquire(self):
+        with self.lock:
+            if self.pending >= self.max_pending:
+                raise ServerBusy(f"Inference queue is full ({self.max_pending} pending requests)")
+            self.pending += 1
+
+    def release(self):
+        with self.lock:
+            self.pending -= 1
+
+    async def run(self, fn, *args):
+        self.acquire()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            self.release()
@@ -0,0 +1,52 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import fft as sp_fft
+
+
+def frame_signal(y, frame_length=2048, hop_length=512, n_frames=None, center=True):
+    if center:
+        y = np.pad(y, frame_length // 2)
+    if n_frames is not None:
+        y = y[:(n_frames - 1) * hop_length + frame_length]
+    if len(y) < frame_length:
+        y = np.pad(y, (0, frame_length - len(y)))
+    return sliding_window_view(y, frame_length)[::hop_length]
+
+
+def cumulative_mean_normalized_difference(frames, max_period):
+    n_fft = sp_fft.next_fast_len(frames.shape[1] + max_period + 1)
+    spectrum = sp_fft.rfft(frames, n_fft, axis=1)
+    autocorrelation = sp_fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, n_fft, axis=1)[:, :max_period + 1]
+
+    energy = np.cumsum(frames[:, :max_period] ** 2, axis=1)
+    difference = np.zeros_like(autocorrelation)
+    difference[:, 1:] = 2 * (autocorrelation[:, :1] - autocorrelation[:, 1:]) - energy
+
+    cumulative_mean = np.cumsum(difference[:, 1:], axis=1) / np.arange(1, max_period + 1)
+    normalized = np.ones_like(difference)
+    normalized[:, 1:] = difference[:, 1:] / (cumulative_mean + 1e-12)
+    return normalized
+
+
+def yin_pitch(y, sr, fmin=50, fmax=500, frame_length=2048, hop_length=512, n_frames=None, threshold=0.3):
+    frames = frame_signal(np.asarray(y, dtype=np.float64), frame_length, hop_length, n_frames)
+    min_period = int(np.floor(sr / fmax))
+    max_period = min(int(np.ceil(sr / fmin)), frame_length - 2)
+
+    normalized = cumulative_mean_normalized_difference(frames, max_period)
+
+    candidates = normalized[:, min_period:max_period]
+    previous = normalized[:, min_period - 1:max_period - 1]
+    following = normalized[:, min_period + 1:max_period + 1]
+    troughs = (candidates <= previous) & (candidates < following) & (candidates < threshold)
+
+    voiced = troughs.any(axis=1)
+    period = min_period + np.argmax(troughs, axis=1)
+
+    rows = np.arange(len(period))
+    before, at, after = normalized[rows, period - 1], normalized[rows, period], normalized[rows, period + 1]
+    curvature = before - 2 * at + after
+    shift = np.where(np.abs(curvature) > 1e-12, 0.5 * (before - after) / np.where(curvature == 0, 1, curvature), 0)
+
+    f0 = sr / (period + np.clip(shift, -1, 1))
+    return np.where(voiced, f0, 0.0)
@@ -1,17 +1,25 @@
 import torch
 from PIL import Image
 
-def predict_image_with_model(model, image_path, class_names, device="cpu", transform=None):
+def predict_batch_with_model(model, input_batch, class_names, device="cpu"):
     model.eval()
-    image = Image.open(image_path).convert("RGB")
-    input_tensor = transform(image).unsqueeze(0).to(device)
+    input_batch = input_batch.to(device)
 
     with torch.no_grad():
-        output = model(input_tensor)
-        probs = torch.nn.functional.softmax(output, dim=1)[0]
-        pred_idx = torch.argmax(probs).item()
+        output = model(input_batch)
+        probs = torch.nn.functional.softmax(output, dim=1)
+        pred_idx = torch.argmax(probs, dim=1).tolist()
+
+    probs = probs.cpu()
+    return [
+        {
+            "predicted_class": class_names[idx],
+            "probabilities": {class_names[i]: float(p[i]) for i in range(len(class_names))}
+        }
+        for idx, p in zip(pred_idx, probs)
+    ]
 
-    return {
-        "predicted_class": class_names[pred_idx],
-        "probabilities": {class_names[i]: float(probs[i]) for i in range(len(class_names))}
-    }
+def predict_image_with_model(model, image_path, class_names, device="cpu", transform=None):
+    image = Image.open(image_path).convert("RGB")
+    input_tensor = transform(image).unsqueeze(0)
+    return predict_batch_with_model(model, input_tensor, class_names, device)[0]
@@ -0,0 +1,115 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def result_key(digest, disease, modality, model_version):
+    return f"{digest}:{disease}:{modality}:{model_version}"
+
+
+class ResultStore:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, result TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def save(self, key, result, stored_at):
+        with self.lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, result, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(result), stored_at)
+            )
+
+    def load(self, key):
+        with self.lock, self._connect() as conn:
+            row = conn.execute("SELECT result, stored_at FROM results WHERE key = ?", (key,)).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def delete(self, key):
+        with self.lock, self._connect() as conn:
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+
+    def evict(self, older_than):
+        with self.lock, self._connect() as conn:
+            conn.execute("DELETE FROM results WHERE stored_at < ?", (older_than,))
+
+
+class ResultCache:
+    def __init__(self, max_entries=256, ttl_s=3600, store_path=None):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.store = ResultStore(store_path) if store_path else None
+        self.last_eviction = time.time()
+        self.metrics = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and now - entry[1] < self.ttl_s:
+                self.entries.move_to_end(key)
+                self.metrics["hits"] += 1
+                return dict(entry[0])
+            self.entries.pop(key, None)
+
+        entry = self.store.load(key) if self.store else None
+        if entry is not None and now - entry[1] < self.ttl_s:
+            self._remember(key, *entry)
+            with self.lock:
+                self.metrics["hits"] += 1
+                self.metrics["disk_hits"] += 1
+            return dict(entry[0])
+
+        with self.lock:
+            self.metrics["misses"] += 1
+        return None
+
+    def put(self, key, result):
+        stored_at = time.time()
+        self._remember(key, result, stored_at)
+        if self.store:
+            self.store.save(key, result, stored_at)
+            self._evict_expired(stored_at)
+
+    def discard(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+        if self.store:
+            self.store.delete(key)
+
+    def _remember(self, key, result, stored_at):
+        with self.lock:
+            self.entries[key] = (dict(result), stored_at)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.metrics["evictions"] += 1
+
+    def _evict_expired(self, now):
+        if now - self.last_eviction < 60:
+            return
+        self.last_eviction = now
+        self.store.evict(now - self.ttl_s)
+
+    def stats(self):
+        with self.lock:
+            requests = self.metrics["hits"] + self.metrics["misses"]
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl_s,
+                "disk_tier": self.store is not None,
+                **self.metrics,
+                "hit_rate": round(self.metrics["hits"] / requests, 4) if requests else None
+            }
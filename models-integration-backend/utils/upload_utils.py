@@ -0,0 +1,45 @@
+import hashlib
+
+import numpy as np
+from PIL import Image
+
+from constants.constants import HASH_CHUNK_SIZE
+
+
+class DecodedUpload:
+    def __init__(self, source, filename):
+        self.source = source
+        self.filename = filename or ""
+        self._rgb = None
+        self._gray = None
+        self._sha256 = None
+
+    @property
+    def rgb(self):
+        if self._rgb is None:
+            self._rgb = Image.open(self.stream()).convert("RGB")
+        return self._rgb
+
+    @property
+    def gray(self):
+        if self._gray is None:
+            self._gray = np.array(self.rgb.convert("L"))
+        return self._gray
+
+    @property
+    def sha256(self):
+        if self._sha256 is None:
+            digest = hashlib.sha256()
+            stream = self.stream()
+            for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+            self._sha256 = digest.hexdigest()
+        return self._sha256
+
+    def stream(self):
+        self.source.seek(0)
+        return self.source
+
+
+def read_upload(file):
+    return DecodedUpload(file.file, file.filename)